@@ -1,84 +1,202 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+from datetime import datetime, timedelta
+import json
 from app.database import get_db
 from app.schemas import (
     UserCreate, UserUpdate, UserResponse, UserWithInstances,
-    InstanceCreate, InstanceUpdate, InstanceResponse,
-    AssignInstancesRequest
+    InstanceCreate, InstanceUpdate, InstanceResponse, InstanceChanges,
+    AssignInstancesRequest, BulkAssignInstancesRequest, BulkAssignInstancesResult,
+    HealthTrend, UserImportResult, AuditLogResponse, DashboardSummary
 )
-from app.models import User, Instance, UserInstance, UserRole
-from app.core.security import get_password_hash
+from app.models import User, Instance, UserInstance, UserRole, AuditLog
+from app.core.security import get_password_hash, token_cache_stats
 from app.core.deps import get_current_admin
+from app.core.auth_cache import Principal, auth_cache
+from app.core.pagination import SORT_PATTERN, keyset_page, prefix_filter, set_next_cursor
+from app.core.etag import check_etag, compute_etag, table_version
+from app.core.serialization import json_response, response_columns
+from app.services.health_history import HealthHistoryService
+from app.services.status_buffer import status_buffer
+from app.services.user_bulk import UserBulkService, FORMATS
+from app.services.audit_log import audit_log
+from app.services.search import INSTANCE_INDEX, USER_INDEX, SearchService
+from app.services.instance_sync import InstanceSyncService
+from app.services.dashboard import DashboardService
+from app.services.fleet_state import fleet_state
 
 router = APIRouter(prefix="/api/admin", tags=["管理员"])
 
 
 # ==================== 用户管理 ====================
 
+# 列表接口返回的用户字段（普通行，不构造 ORM 对象），顺序与 UserWithInstances 一致
+_USER_COLUMNS = response_columns(User, UserWithInstances)
+
+
+def _users_with_instances(db: Session, users) -> List[Dict[str, Any]]:
+    """
+    为用户行附加实例ID列表，返回可直接编码为 JSON 的字典
+
+    一次查询取出这些用户的全部实例关联，查询次数与用户数量无关。
+    """
+    if not users:
+        return []
+    
+    instance_ids: Dict[int, List[int]] = defaultdict(list)
+    rows = db.query(UserInstance.user_id, UserInstance.instance_id).filter(
+        UserInstance.user_id.in_([user.id for user in users])
+    ).order_by(UserInstance.user_id, UserInstance.instance_id)
+    for user_id, instance_id in rows:
+        instance_ids[user_id].append(instance_id)
+    
+    return [
+        {**user._asdict(), "instance_ids": instance_ids.get(user.id, [])}
+        for user in users
+    ]
+
+
 @router.get("/users", response_model=List[UserWithInstances], summary="获取用户列表")
 def get_users(
-    skip: int = 0,
-    limit: int = 100,
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    sort: str = Query("id", pattern=SORT_PATTERN),
+    role: Optional[UserRole] = None,
+    username_prefix: Optional[str] = Query(None, min_length=1, max_length=50),
     db: Session = Depends(get_db),
-    current_admin: User = Depends(get_current_admin)
+    current_admin: Principal = Depends(get_current_admin)
 ):
     """
-    获取所有用户列表（管理员权限）
+    获取用户列表（管理员权限，游标分页）
+    
+    - **cursor**: 上一页响应头 X-Next-Cursor 中的游标，首页不传
+    - **limit**: 每页数量（1-500）
+    - **sort**: 排序键：id、updated_at，前缀 "-" 表示降序
+    - **role**: 按角色筛选
+    - **username_prefix**: 按用户名前缀筛选
     
-    - **skip**: 跳过的记录数
-    - **limit**: 返回的最大记录数
+    支持 If-None-Match：数据未变化时返回 304
+    """
+    not_modified = check_etag(request, response, compute_etag(request, table_version(db, User)))
+    if not_modified:
+        return not_modified
+    
+    query = db.query(*_USER_COLUMNS)
+    if role is not None:
+        query = query.filter(User.role == role)
+    if username_prefix:
+        query = query.filter(prefix_filter(User.username, username_prefix))
+    
+    users, next_cursor = keyset_page(query, User, sort, cursor, limit)
+    set_next_cursor(response, next_cursor)
+    return json_response(_users_with_instances(db, users), response)
+
+
+def _file_format(format: Optional[str], filename: Optional[str]) -> str:
+    """确定导入文件格式：优先使用 format 参数，否则按扩展名判断"""
+    if format:
+        return format
+    extension = (filename or "").rsplit(".", 1)[-1].lower()
+    if extension == "ndjson":
+        extension = "jsonl"
+    if extension not in FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="无法识别文件格式，请指定 format=csv 或 format=jsonl"
+        )
+    return extension
+
+
+@router.post("/users/import", response_model=UserImportResult, summary="批量导入用户")
+def import_users(
+    file: UploadFile = File(..., description="CSV 或 JSONL 文件"),
+    format: Optional[str] = Query(None, pattern="^(csv|jsonl)$"),
+    db: Session = Depends(get_db),
+    current_admin: Principal = Depends(get_current_admin)
+):
     """
-    users = db.query(User).offset(skip).limit(limit).all()
+    批量导入用户（管理员权限）
     
-    # 为每个用户添加实例ID列表
-    result = []
-    for user in users:
-        user_dict = {
-            "id": user.id,
-            "username": user.username,
-            "role": user.role,
-            "created_at": user.created_at,
-            "updated_at": user.updated_at,
-            "instance_ids": [ui.instance_id for ui in user.user_instances]
-        }
-        result.append(UserWithInstances(**user_dict))
+    - **file**: CSV（表头包含 username,password，可选 role,instance_ids）或 JSONL（每行一个对象）
+    - **format**: 文件格式，不传时按扩展名判断
     
+    instance_ids 在 CSV 中以分号分隔，在 JSONL 中为数组。合法的行会被创建，
+    不合法的行（用户名重复、密码过短、实例不存在等）逐行返回在 errors 中。
+    """
+    result = UserBulkService.import_users(db, file.file, _file_format(format, file.filename))
+    audit_log.record(current_admin, "user.import", "user", None,
+                     filename=file.filename, created=result["created"], failed=result["failed"])
     return result
 
 
+@router.get("/users/export", summary="导出用户")
+def export_users(
+    format: str = Query("csv", pattern="^(csv|jsonl)$"),
+    current_admin: Principal = Depends(get_current_admin)
+):
+    """
+    流式导出所有用户及其实例分配（管理员权限，不含密码）
+    
+    - **format**: csv 或 jsonl
+    """
+    return StreamingResponse(
+        UserBulkService.export_users(format),
+        media_type="text/csv" if format == "csv" else "application/x-ndjson",
+        headers={"Content-Disposition": f"attachment; filename=users.{format}"}
+    )
+
+
+@router.get("/users/search", response_model=List[UserWithInstances], summary="搜索用户")
+def search_users(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=100),
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_admin: Principal = Depends(get_current_admin)
+):
+    """
+    按用户名全文搜索用户（管理员权限，按相关度排序，游标分页）
+    
+    - **q**: 搜索词，多个词以空格分隔，每个词按前缀匹配且需同时满足
+    - **cursor**: 上一页响应头 X-Next-Cursor 中的游标，首页不传
+    """
+    ids, next_cursor = SearchService.search_ids(db, User, USER_INDEX, q, cursor, limit)
+    set_next_cursor(response, next_cursor)
+    if not ids:
+        return []
+    users = db.query(*_USER_COLUMNS).filter(User.id.in_(ids)).all()
+    return _users_with_instances(db, SearchService.in_order(users, ids))
+
+
 @router.get("/users/{user_id}", response_model=UserWithInstances, summary="获取用户详情")
 def get_user(
     user_id: int,
     db: Session = Depends(get_db),
-    current_admin: User = Depends(get_current_admin)
+    current_admin: Principal = Depends(get_current_admin)
 ):
     """获取指定用户的详细信息（管理员权限）"""
-    user = db.query(User).filter(User.id == user_id).first()
+    users = _users_with_instances(db, db.query(*_USER_COLUMNS).filter(User.id == user_id).all())
     
-    if not user:
+    if not users:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="用户不存在"
         )
     
-    user_dict = {
-        "id": user.id,
-        "username": user.username,
-        "role": user.role,
-        "created_at": user.created_at,
-        "updated_at": user.updated_at,
-        "instance_ids": [ui.instance_id for ui in user.user_instances]
-    }
-    
-    return UserWithInstances(**user_dict)
+    return users[0]
 
 
 @router.post("/users", response_model=UserResponse, summary="创建用户", status_code=status.HTTP_201_CREATED)
 def create_user(
     user_data: UserCreate,
     db: Session = Depends(get_db),
-    current_admin: User = Depends(get_current_admin)
+    current_admin: Principal = Depends(get_current_admin)
 ):
     """
     创建新用户（管理员权限）
@@ -105,6 +223,8 @@ def create_user(
     db.add(new_user)
     db.commit()
     db.refresh(new_user)
+    audit_log.record(current_admin, "user.create", "user", new_user.id,
+                     username=new_user.username, role=new_user.role.value)
     
     return new_user
 
@@ -114,7 +234,7 @@ def update_user(
     user_id: int,
     user_data: UserUpdate,
     db: Session = Depends(get_db),
-    current_admin: User = Depends(get_current_admin)
+    current_admin: Principal = Depends(get_current_admin)
 ):
     """
     更新用户信息（管理员权限）
@@ -153,6 +273,10 @@ def update_user(
     
     db.commit()
     db.refresh(user)
+    auth_cache.invalidate_user(user_id)
+    audit_log.record(current_admin, "user.update", "user", user_id,
+                     **user_data.model_dump(exclude_none=True, exclude={"password"}),
+                     password_changed=user_data.password is not None)
     
     return user
 
@@ -161,7 +285,7 @@ def update_user(
 def delete_user(
     user_id: int,
     db: Session = Depends(get_db),
-    current_admin: User = Depends(get_current_admin)
+    current_admin: Principal = Depends(get_current_admin)
 ):
     """删除用户（管理员权限）"""
     user = db.query(User).filter(User.id == user_id).first()
@@ -179,39 +303,100 @@ def delete_user(
             detail="不能删除自己的账号"
         )
     
+    username = user.username
     db.delete(user)
     db.commit()
+    auth_cache.invalidate_user(user_id)
+    audit_log.record(current_admin, "user.delete", "user", user_id, username=username)
     
     return None
 
 
 # ==================== 实例管理 ====================
 
+
 @router.get("/instances", response_model=List[InstanceResponse], summary="获取实例列表")
 def get_instances(
-    skip: int = 0,
-    limit: int = 100,
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    sort: str = Query("id", pattern=SORT_PATTERN),
+    health_status: Optional[str] = Query(None, max_length=50),
+    container_status: Optional[str] = Query(None, max_length=50),
+    name_prefix: Optional[str] = Query(None, min_length=1, max_length=100),
+    current_admin: Principal = Depends(get_current_admin)
+):
+    """
+    获取实例列表（管理员权限，游标分页，从进程内实例状态表读取，不查询数据库）
+    
+    - **cursor**: 上一页响应头 X-Next-Cursor 中的游标，首页不传
+    - **limit**: 每页数量（1-500）
+    - **sort**: 排序键：id、updated_at，前缀 "-" 表示降序
+    - **health_status**: 按健康状态筛选（healthy / unhealthy / unknown）
+    - **container_status**: 按容器状态筛选（running / exited / ...）
+    - **name_prefix**: 按实例名称前缀筛选
+    
+    支持 If-None-Match：数据未变化时返回 304
+    """
+    not_modified = check_etag(request, response, compute_etag(request, fleet_state.version()))
+    if not_modified:
+        return not_modified
+    
+    instances, next_cursor = fleet_state.page(
+        sort, cursor, limit,
+        health_status=health_status or None,
+        container_status=container_status or None,
+        name_prefix=name_prefix
+    )
+    set_next_cursor(response, next_cursor)
+    return json_response(instances, response)
+
+
+@router.get("/instances/changes", response_model=InstanceChanges, summary="增量同步实例列表")
+def get_instance_changes(
+    since: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_admin: User = Depends(get_current_admin)
+    current_admin: Principal = Depends(get_current_admin)
 ):
     """
-    获取所有实例列表（管理员权限）
+    返回自上次同步以来变化的实例和已删除的实例ID（管理员权限）
     
-    - **skip**: 跳过的记录数
-    - **limit**: 返回的最大记录数
+    - **since**: 上次响应中的 cursor；不传或游标已过期时返回全部实例（full 为 true）
     """
-    instances = db.query(Instance).offset(skip).limit(limit).all()
-    return instances
+    return InstanceSyncService.changes(db, since)
+
+
+@router.get("/instances/search", response_model=List[InstanceResponse], summary="搜索实例")
+def search_instances(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=100),
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_admin: Principal = Depends(get_current_admin)
+):
+    """
+    按名称、描述、URL 和容器名全文搜索实例（管理员权限，按相关度排序，游标分页）
+    
+    - **q**: 搜索词，多个词以空格分隔，每个词按前缀匹配且需同时满足
+    - **cursor**: 上一页响应头 X-Next-Cursor 中的游标，首页不传
+    """
+    ids, next_cursor = SearchService.search_ids(db, Instance, INSTANCE_INDEX, q, cursor, limit)
+    set_next_cursor(response, next_cursor)
+    if not ids:
+        return []
+    instances = db.query(Instance).filter(Instance.id.in_(ids)).all()
+    return SearchService.in_order(instances, ids)
 
 
 @router.get("/instances/{instance_id}", response_model=InstanceResponse, summary="获取实例详情")
 def get_instance(
     instance_id: int,
-    db: Session = Depends(get_db),
-    current_admin: User = Depends(get_current_admin)
+    current_admin: Principal = Depends(get_current_admin)
 ):
-    """获取指定实例的详细信息（管理员权限）"""
-    instance = db.query(Instance).filter(Instance.id == instance_id).first()
+    """获取指定实例的详细信息（管理员权限，从进程内实例状态表读取）"""
+    instance = fleet_state.get(instance_id)
     
     if not instance:
         raise HTTPException(
@@ -219,7 +404,7 @@ def get_instance(
             detail="实例不存在"
         )
     
-    return instance
+    return json_response(instance)
 
 
 @router.post("/instances", response_model=InstanceResponse, summary="创建实例", status_code=status.HTTP_201_CREATED)
@@ -227,7 +412,7 @@ def create_instance(
     instance_data: InstanceCreate,
     auto_deploy: bool = False,  # 是否自动部署 Docker 容器
     db: Session = Depends(get_db),
-    current_admin: User = Depends(get_current_admin)
+    current_admin: Principal = Depends(get_current_admin)
 ):
     """
     创建新实例（管理员权限）
@@ -262,6 +447,7 @@ def create_instance(
             new_instance.config_path = container_info['config_path']
             new_instance.host_port = container_info['host_port']
             new_instance.container_status = container_info['status']
+            status_buffer.forget(new_instance.id)
             
             # 尝试获取远程 URL（从 deploy.yaml 自动读取 SSH 用户名）
             try:
@@ -284,6 +470,9 @@ def create_instance(
                 detail=f"自动部署容器失败: {str(e)}"
             )
     
+    fleet_state.put(new_instance)
+    audit_log.record(current_admin, "instance.create", "instance", new_instance.id,
+                     name=new_instance.name, auto_deploy=auto_deploy)
     return new_instance
 
 
@@ -292,7 +481,7 @@ def update_instance(
     instance_id: int,
     instance_data: InstanceUpdate,
     db: Session = Depends(get_db),
-    current_admin: User = Depends(get_current_admin)
+    current_admin: Principal = Depends(get_current_admin)
 ):
     """
     更新实例信息（管理员权限）
@@ -321,6 +510,9 @@ def update_instance(
     
     db.commit()
     db.refresh(instance)
+    fleet_state.put(instance)
+    audit_log.record(current_admin, "instance.update", "instance", instance_id,
+                     **instance_data.model_dump(exclude_none=True))
     
     return instance
 
@@ -329,7 +521,7 @@ def update_instance(
 def delete_instance(
     instance_id: int,
     db: Session = Depends(get_db),
-    current_admin: User = Depends(get_current_admin)
+    current_admin: Principal = Depends(get_current_admin)
 ):
     """删除实例（管理员权限）"""
     instance = db.query(Instance).filter(Instance.id == instance_id).first()
@@ -340,20 +532,41 @@ def delete_instance(
             detail="实例不存在"
         )
     
+    name = instance.name
+    # 级联删除实例分配，相关用户的数据随之变化
+    user_ids = [row.user_id for row in db.query(UserInstance.user_id).filter(UserInstance.instance_id == instance_id)]
     db.delete(instance)
+    InstanceSyncService.record_deletion(db, instance_id)
+    UserBulkService.touch_users(db, user_ids)
     db.commit()
+    status_buffer.forget(instance_id)
+    fleet_state.remove(instance_id)
+    auth_cache.invalidate_all()
+    audit_log.record(current_admin, "instance.delete", "instance", instance_id, name=name)
     
     return None
 
 
 # ==================== 用户实例权限管理 ====================
 
+def _check_instances_exist(db: Session, instance_ids: set):
+    """验证实例ID均存在，否则返回 400"""
+    if not instance_ids:
+        return
+    found = {instance_id for (instance_id,) in db.query(Instance.id).filter(Instance.id.in_(instance_ids))}
+    if found != instance_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"部分实例ID不存在: {sorted(instance_ids - found)}"
+        )
+
+
 @router.post("/users/{user_id}/instances", summary="为用户分配实例", status_code=status.HTTP_200_OK)
 def assign_instances(
     user_id: int,
     assign_data: AssignInstancesRequest,
     db: Session = Depends(get_db),
-    current_admin: User = Depends(get_current_admin)
+    current_admin: Principal = Depends(get_current_admin)
 ):
     """
     为用户分配实例访问权限（管理员权限）
@@ -371,24 +584,49 @@ def assign_instances(
         )
     
     # 验证所有实例ID是否存在
-    instances = db.query(Instance).filter(Instance.id.in_(assign_data.instance_ids)).all()
-    if len(instances) != len(assign_data.instance_ids):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="部分实例ID不存在"
-        )
+    _check_instances_exist(db, set(assign_data.instance_ids))
+    
+    # 只增删有变化的关联
+    result = UserBulkService.apply_assignments(db, {user_id: assign_data.instance_ids})
+    db.commit()
+    auth_cache.invalidate_user(user_id)
+    audit_log.record(current_admin, "user.assign_instances", "user", user_id,
+                     instance_ids=sorted(set(assign_data.instance_ids)),
+                     added=result["added"], removed=result["removed"])
+    
+    return {"message": "实例分配成功", "user_id": user_id, "instance_ids": assign_data.instance_ids}
+
+
+@router.put("/assignments", response_model=BulkAssignInstancesResult, summary="批量分配实例")
+def bulk_assign_instances(
+    assign_data: BulkAssignInstancesRequest,
+    db: Session = Depends(get_db),
+    current_admin: Principal = Depends(get_current_admin)
+):
+    """
+    批量设置多个用户的实例访问权限（管理员权限）
     
-    # 删除用户现有的所有实例关联
-    db.query(UserInstance).filter(UserInstance.user_id == user_id).delete()
+    - **assignments**: {用户ID: 实例ID列表}，每个用户的分配会被替换为给定列表
     
-    # 创建新的关联
-    for instance_id in assign_data.instance_ids:
-        user_instance = UserInstance(user_id=user_id, instance_id=instance_id)
-        db.add(user_instance)
+    与当前分配比较后只增删有变化的关联，所有变更在一个事务中完成；
+    任一用户或实例不存在时整体不做修改。
+    """
+    user_ids = set(assign_data.assignments)
+    found = {user_id for (user_id,) in db.query(User.id).filter(User.id.in_(user_ids))}
+    if found != user_ids:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"用户不存在: {sorted(user_ids - found)}"
+        )
+    _check_instances_exist(db, {i for ids in assign_data.assignments.values() for i in ids})
     
+    result = UserBulkService.apply_assignments(db, assign_data.assignments)
     db.commit()
+    for user_id in result["changed_user_ids"]:
+        auth_cache.invalidate_user(user_id)
+    audit_log.record(current_admin, "user.bulk_assign_instances", "user", None, users=len(user_ids), **result)
     
-    return {"message": "实例分配成功", "user_id": user_id, "instance_ids": assign_data.instance_ids}
+    return {"message": "批量分配成功", "users": len(user_ids), **result}
 
 
 @router.delete("/users/{user_id}/instances/{instance_id}", summary="取消用户实例访问权限", status_code=status.HTTP_204_NO_CONTENT)
@@ -396,7 +634,7 @@ def revoke_instance(
     user_id: int,
     instance_id: int,
     db: Session = Depends(get_db),
-    current_admin: User = Depends(get_current_admin)
+    current_admin: Principal = Depends(get_current_admin)
 ):
     """取消用户对特定实例的访问权限（管理员权限）"""
     user_instance = db.query(UserInstance).filter(
@@ -411,6 +649,140 @@ def revoke_instance(
         )
     
     db.delete(user_instance)
+    UserBulkService.touch_users(db, [user_id])
     db.commit()
+    auth_cache.invalidate_user(user_id)
+    audit_log.record(current_admin, "user.revoke_instance", "user", user_id, instance_id=instance_id)
     
     return None
+
+
+# ==================== 健康检查历史 ====================
+
+@router.get("/health/trends", response_model=HealthTrend, summary="获取全体实例健康趋势")
+def get_fleet_health_trend(
+    period: str = Query("hour", pattern="^(hour|day)$"),
+    days: int = Query(1, ge=1, le=365),
+    db: Session = Depends(get_db),
+    current_admin: Principal = Depends(get_current_admin)
+):
+    """
+    获取全体实例的健康趋势（管理员权限）
+    
+    成功率为精确值；响应时间为各实例百分位的加权平均（avg_p50_ms / avg_p95_ms），是近似值
+    
+    - **period**: 汇总周期（hour/day）
+    - **days**: 查询最近多少天
+    """
+    since = datetime.utcnow() - timedelta(days=days)
+    return HealthHistoryService.get_fleet_trend(db, period, since)
+
+
+@router.get("/instances/{instance_id}/health", response_model=HealthTrend, summary="获取实例健康趋势")
+def get_instance_health_trend(
+    instance_id: int,
+    period: str = Query("hour", pattern="^(hour|day)$"),
+    days: int = Query(1, ge=1, le=365),
+    db: Session = Depends(get_db),
+    current_admin: Principal = Depends(get_current_admin)
+):
+    """
+    获取指定实例的健康趋势：成功率与 p50/p95 响应时间（管理员权限）
+    
+    - **period**: 汇总周期（hour/day）
+    - **days**: 查询最近多少天
+    """
+    instance = db.query(Instance).filter(Instance.id == instance_id).first()
+    
+    if not instance:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="实例不存在"
+        )
+    
+    since = datetime.utcnow() - timedelta(days=days)
+    return HealthHistoryService.get_instance_trend(db, instance_id, period, since)
+
+
+# ==================== 仪表盘 ====================
+
+@router.get("/dashboard", response_model=DashboardSummary, summary="获取仪表盘汇总")
+def get_dashboard(
+    db: Session = Depends(get_db),
+    current_admin: Principal = Depends(get_current_admin)
+):
+    """
+    一次返回管理员首页所需的数据（管理员权限）
+    
+    包括按状态统计的实例数、用户数、最近探测失败的实例、带容器实时状态的实例列表和宿主机容量。
+    """
+    return DashboardService.summary(db)
+
+
+# ==================== 审计日志 ====================
+
+@router.get("/audit-logs", response_model=List[AuditLogResponse], summary="查询审计日志")
+def get_audit_logs(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    actor_id: Optional[int] = None,
+    action: Optional[str] = Query(None, max_length=50),
+    target_type: Optional[str] = Query(None, max_length=50),
+    target_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: Session = Depends(get_db),
+    current_admin: Principal = Depends(get_current_admin)
+):
+    """
+    按时间倒序查询审计日志（管理员权限，游标分页）
+    
+    - **cursor**: 上一页响应头 X-Next-Cursor 中的游标，首页不传
+    - **actor_id**: 操作者用户ID
+    - **action**: 操作名称，如 instance.deploy
+    - **target_type** / **target_id**: 操作对象
+    - **since** / **until**: 时间范围（UTC）
+    """
+    query = db.query(AuditLog)
+    if actor_id is not None:
+        query = query.filter(AuditLog.actor_id == actor_id)
+    if action:
+        query = query.filter(AuditLog.action == action)
+    if target_type:
+        query = query.filter(AuditLog.target_type == target_type)
+    if target_id is not None:
+        query = query.filter(AuditLog.target_id == target_id)
+    if since:
+        query = query.filter(AuditLog.created_at >= since)
+    if until:
+        query = query.filter(AuditLog.created_at < until)
+    
+    logs, next_cursor = keyset_page(query, AuditLog, "-created_at", cursor, limit)
+    set_next_cursor(response, next_cursor)
+    return [
+        AuditLogResponse(
+            id=log.id,
+            created_at=log.created_at,
+            actor_id=log.actor_id,
+            actor_username=log.actor_username,
+            action=log.action,
+            target_type=log.target_type,
+            target_id=log.target_id,
+            detail=json.loads(log.detail) if log.detail else None
+        )
+        for log in logs
+    ]
+
+
+# ==================== 系统状态 ====================
+
+@router.get("/system/cache-stats", summary="获取认证缓存统计")
+def get_cache_stats(
+    current_admin: Principal = Depends(get_current_admin)
+):
+    """获取当前进程的令牌缓存与认证主体缓存统计（管理员权限）"""
+    return {
+        "token_cache": token_cache_stats(),
+        "auth_cache": auth_cache.stats()
+    }
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
 from datetime import timedelta
 from app.database import get_db
@@ -6,17 +6,22 @@ from app.schemas import Token, LoginRequest, RefreshTokenRequest
 from app.models import User
 from app.core.security import (
     verify_password,
+    get_password_hash,
+    password_needs_rehash,
     create_access_token,
     create_refresh_token,
     decode_token
 )
+from app.core.rate_limit import rate_limit, enforce, client_ip
+from app.core.password_hasher import PasswordHasherBusy
 from app.config import settings
 
 router = APIRouter(prefix="/api/auth", tags=["认证"])
 
 
-@router.post("/login", response_model=Token, summary="用户登录")
+@router.post("/login", response_model=Token, summary="用户登录", dependencies=[Depends(rate_limit("login"))])
 def login(
+    request: Request,
     login_data: LoginRequest,
     db: Session = Depends(get_db)
 ):
@@ -28,10 +33,16 @@ def login(
     
     返回访问令牌和刷新令牌
     """
+    # 同一来源对同一用户名的失败次数单独限流：只有失败才消耗令牌，
+    # 并按 (用户名, IP) 计数，其他来源无法通过反复失败把真实用户锁在外面
+    user_key = f"{login_data.username}:{client_ip(request)}"
+    enforce("login_user", user_key, consume=False)
+    
     # 查询用户
     user = db.query(User).filter(User.username == login_data.username).first()
     
     if not user:
+        enforce("login_user", user_key)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="用户名或密码错误"
@@ -39,11 +50,20 @@ def login(
     
     # 验证密码
     if not verify_password(login_data.password, user.password_hash):
+        enforce("login_user", user_key)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="用户名或密码错误"
         )
     
+    # cost 已过时的哈希在登录成功时透明升级；哈希队列已满时跳过，下次登录再升级，不影响本次登录
+    if password_needs_rehash(user.password_hash):
+        try:
+            user.password_hash = get_password_hash(login_data.password)
+            db.commit()
+        except PasswordHasherBusy:
+            print(f"[Auth] 密码哈希队列已满，跳过用户 {user.username} 的哈希升级")
+    
     # 创建令牌
     access_token = create_access_token(data={"sub": user.username, "role": user.role.value})
     refresh_token = create_refresh_token(data={"sub": user.username})
@@ -1,10 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from app.database import get_db
-from app.models import User, Instance
+from app.database import get_async_db
+from app.models import Instance
 from app.core.deps import get_current_admin
+from app.core.auth_cache import Principal
+from app.core.rate_limit import rate_limit
 from app.services import DockerService
+from app.services.status_buffer import status_buffer
+from app.services.fleet_state import fleet_state
+from app.services.audit_log import audit_log
 import yaml
 import os
 
@@ -15,11 +21,29 @@ class ConfigUpdate(BaseModel):
 router = APIRouter(prefix="/api/admin/docker", tags=["Docker管理"])
 
 
-@router.post("/instances/{instance_id}/deploy", summary="为实例部署 Docker 容器")
+async def _get_instance(db: AsyncSession, instance_id: int) -> Instance:
+    """
+    读取实例，不存在时返回 404
+
+    读取后立即结束只读事务、归还连接：之后的 Docker 调用可能耗时数秒，期间不占用连接池。
+    会话不会在提交时过期对象，返回的实例仍可读取和修改，下次提交时才重新取连接写入。
+    """
+    instance = await db.get(Instance, instance_id)
+    await db.commit()
+    
+    if not instance:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="实例不存在"
+        )
+    return instance
+
+
+@router.post("/instances/{instance_id}/deploy", summary="为实例部署 Docker 容器", dependencies=[Depends(rate_limit("deploy"))])
 async def deploy_instance(
     instance_id: int,
-    db: Session = Depends(get_db),
-    current_admin: User = Depends(get_current_admin)
+    db: AsyncSession = Depends(get_async_db),
+    current_admin: Principal = Depends(get_current_admin)
 ):
     """
     为指定实例部署 Docker 容器
@@ -29,13 +53,7 @@ async def deploy_instance(
     注意：SSH 用户名将从容器内的 deploy.yaml 配置文件自动读取
     """
     # 获取实例
-    instance = db.query(Instance).filter(Instance.id == instance_id).first()
-    
-    if not instance:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="实例不存在"
-        )
+    instance = await _get_instance(db, instance_id)
     
     # 检查是否已经部署
     if instance.container_id:
@@ -45,10 +63,10 @@ async def deploy_instance(
         )
     
     try:
-        docker_service = DockerService()
+        docker_service = await run_in_threadpool(DockerService)
         
         # 创建容器
-        container_info = docker_service.create_container(instance.name)
+        container_info = await run_in_threadpool(docker_service.create_container, instance.name)
         
         # 更新实例信息
         instance.container_id = container_info['container_id']
@@ -56,21 +74,25 @@ async def deploy_instance(
         instance.config_path = container_info['config_path']
         instance.host_port = container_info['host_port']
         instance.container_status = container_info['status']
+        status_buffer.forget(instance.id)
         
         # 尝试获取远程 URL（从 deploy.yaml 自动读取 SSH 用户名）
         try:
-            remote_url = docker_service.get_remote_url(container_info['config_path'])
+            remote_url = await run_in_threadpool(docker_service.get_remote_url, container_info['config_path'])
             instance.url = remote_url
             
             # 获取 URL 后重启容器以确保配置生效
             print(f"获取 URL 成功 ({remote_url})，正在重启容器...")
-            docker_service.restart_container(instance.container_id)
+            await run_in_threadpool(docker_service.restart_container, instance.container_id)
         except Exception as e:
             # 如果无法立即获取 URL，保持原 URL 不变
             print(f"警告：无法获取远程 URL 或重启容器失败: {str(e)}")
         
-        db.commit()
-        db.refresh(instance)
+        await db.commit()
+        await db.refresh(instance)
+        fleet_state.put(instance)
+        audit_log.record(current_admin, "instance.deploy", "instance", instance_id,
+                         container_name=instance.container_name)
         
         return {
             "message": "容器部署成功",
@@ -83,27 +105,21 @@ async def deploy_instance(
         }
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"部署容器失败: {str(e)}"
         )
 
 
-@router.post("/instances/{instance_id}/start", summary="启动实例容器")
+@router.post("/instances/{instance_id}/start", summary="启动实例容器", dependencies=[Depends(rate_limit("container_action"))])
 async def start_instance_container(
     instance_id: int,
-    db: Session = Depends(get_db),
-    current_admin: User = Depends(get_current_admin)
+    db: AsyncSession = Depends(get_async_db),
+    current_admin: Principal = Depends(get_current_admin)
 ):
     """启动指定实例的 Docker 容器"""
-    instance = db.query(Instance).filter(Instance.id == instance_id).first()
-    
-    if not instance:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="实例不存在"
-        )
+    instance = await _get_instance(db, instance_id)
     
     if not instance.container_id:
         raise HTTPException(
@@ -112,11 +128,13 @@ async def start_instance_container(
         )
     
     try:
-        docker_service = DockerService()
-        docker_service.start_container(instance.container_id)
+        docker_service = await run_in_threadpool(DockerService)
+        await run_in_threadpool(docker_service.start_container, instance.container_id)
         
-        instance.container_status = "running"
-        db.commit()
+        # 状态经写缓冲合并落库
+        status_buffer.observe(instance.id, container_status=instance.container_status)
+        status_buffer.update(instance.id, container_status="running")
+        audit_log.record(current_admin, "instance.start", "instance", instance_id)
         
         return {"message": "容器启动成功", "instance_id": instance_id}
         
@@ -127,20 +145,14 @@ async def start_instance_container(
         )
 
 
-@router.post("/instances/{instance_id}/stop", summary="停止实例容器")
+@router.post("/instances/{instance_id}/stop", summary="停止实例容器", dependencies=[Depends(rate_limit("container_action"))])
 async def stop_instance_container(
     instance_id: int,
-    db: Session = Depends(get_db),
-    current_admin: User = Depends(get_current_admin)
+    db: AsyncSession = Depends(get_async_db),
+    current_admin: Principal = Depends(get_current_admin)
 ):
     """停止指定实例的 Docker 容器"""
-    instance = db.query(Instance).filter(Instance.id == instance_id).first()
-    
-    if not instance:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="实例不存在"
-        )
+    instance = await _get_instance(db, instance_id)
     
     if not instance.container_id:
         raise HTTPException(
@@ -149,11 +161,13 @@ async def stop_instance_container(
         )
     
     try:
-        docker_service = DockerService()
-        docker_service.stop_container(instance.container_id)
+        docker_service = await run_in_threadpool(DockerService)
+        await run_in_threadpool(docker_service.stop_container, instance.container_id)
         
-        instance.container_status = "stopped"
-        db.commit()
+        # 状态经写缓冲合并落库
+        status_buffer.observe(instance.id, container_status=instance.container_status)
+        status_buffer.update(instance.id, container_status="stopped")
+        audit_log.record(current_admin, "instance.stop", "instance", instance_id)
         
         return {"message": "容器停止成功", "instance_id": instance_id}
         
@@ -167,17 +181,11 @@ async def stop_instance_container(
 @router.delete("/instances/{instance_id}/container", summary="删除实例容器")
 async def remove_instance_container(
     instance_id: int,
-    db: Session = Depends(get_db),
-    current_admin: User = Depends(get_current_admin)
+    db: AsyncSession = Depends(get_async_db),
+    current_admin: Principal = Depends(get_current_admin)
 ):
     """删除指定实例的 Docker 容器"""
-    instance = db.query(Instance).filter(Instance.id == instance_id).first()
-    
-    if not instance:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="实例不存在"
-        )
+    instance = await _get_instance(db, instance_id)
     
     if not instance.container_id:
         raise HTTPException(
@@ -186,8 +194,8 @@ async def remove_instance_container(
         )
     
     try:
-        docker_service = DockerService()
-        docker_service.remove_container(instance.container_id)
+        docker_service = await run_in_threadpool(DockerService)
+        await run_in_threadpool(docker_service.remove_container, instance.container_id)
         
         # 清除容器信息
         instance.container_id = None
@@ -195,8 +203,12 @@ async def remove_instance_container(
         instance.config_path = None
         instance.host_port = None
         instance.container_status = "removed"
+        status_buffer.forget(instance.id)
         
-        db.commit()
+        await db.commit()
+        await db.refresh(instance)
+        fleet_state.put(instance)
+        audit_log.record(current_admin, "instance.remove_container", "instance", instance_id)
         
         return {"message": "容器删除成功", "instance_id": instance_id}
         
@@ -210,17 +222,11 @@ async def remove_instance_container(
 @router.get("/instances/{instance_id}/status", summary="获取实例容器状态")
 async def get_instance_container_status(
     instance_id: int,
-    db: Session = Depends(get_db),
-    current_admin: User = Depends(get_current_admin)
+    db: AsyncSession = Depends(get_async_db),
+    current_admin: Principal = Depends(get_current_admin)
 ):
     """获取指定实例的 Docker 容器状态"""
-    instance = db.query(Instance).filter(Instance.id == instance_id).first()
-    
-    if not instance:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="实例不存在"
-        )
+    instance = await _get_instance(db, instance_id)
     
     if not instance.container_id:
         return {
@@ -230,12 +236,12 @@ async def get_instance_container_status(
         }
     
     try:
-        docker_service = DockerService()
-        container_status = docker_service.get_container_status(instance.container_id)
+        docker_service = await run_in_threadpool(DockerService)
+        container_status = await run_in_threadpool(docker_service.get_container_status, instance.container_id)
         
-        # 更新数据库中的状态
-        instance.container_status = container_status['status']
-        db.commit()
+        # 更新数据库中的状态（未变化时不写入）
+        status_buffer.observe(instance.id, container_status=instance.container_status)
+        status_buffer.update(instance.id, container_status=container_status['status'])
         
         return {
             "instance_id": instance_id,
@@ -250,11 +256,11 @@ async def get_instance_container_status(
         )
 
 
-@router.post("/instances/{instance_id}/update-url", summary="更新实例远程 URL")
+@router.post("/instances/{instance_id}/update-url", summary="更新实例远程 URL", dependencies=[Depends(rate_limit("container_action"))])
 async def update_instance_remote_url(
     instance_id: int,
-    db: Session = Depends(get_db),
-    current_admin: User = Depends(get_current_admin)
+    db: AsyncSession = Depends(get_async_db),
+    current_admin: Principal = Depends(get_current_admin)
 ):
     """
     更新实例的远程访问 URL
@@ -262,13 +268,7 @@ async def update_instance_remote_url(
     通过 SSH 隧道重新获取远程 URL 并更新到数据库
     注意：SSH 用户名将从 deploy.yaml 配置文件自动读取
     """
-    instance = db.query(Instance).filter(Instance.id == instance_id).first()
-    
-    if not instance:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="实例不存在"
-        )
+    instance = await _get_instance(db, instance_id)
     
     if not instance.config_path:
         raise HTTPException(
@@ -277,17 +277,20 @@ async def update_instance_remote_url(
         )
     
     try:
-        docker_service = DockerService()
-        remote_url = docker_service.get_remote_url(instance.config_path)
+        docker_service = await run_in_threadpool(DockerService)
+        remote_url = await run_in_threadpool(docker_service.get_remote_url, instance.config_path)
         
         instance.url = remote_url
-        db.commit()
+        await db.commit()
+        await db.refresh(instance)
+        fleet_state.put(instance)
+        audit_log.record(current_admin, "instance.update_url", "instance", instance_id, url=remote_url)
         
         # 获取 URL 后重启容器以确保配置生效
         if instance.container_id:
             try:
                 print(f"URL 更新成功 ({remote_url})，正在重启容器...")
-                docker_service.restart_container(instance.container_id)
+                await run_in_threadpool(docker_service.restart_container, instance.container_id)
             except Exception as e:
                 print(f"警告：重启容器失败: {str(e)}")
         
@@ -304,20 +307,14 @@ async def update_instance_remote_url(
         )
 
 
-@router.post("/instances/{instance_id}/restart", summary="重启实例容器")
+@router.post("/instances/{instance_id}/restart", summary="重启实例容器", dependencies=[Depends(rate_limit("container_action"))])
 async def restart_instance_container(
     instance_id: int,
-    db: Session = Depends(get_db),
-    current_admin: User = Depends(get_current_admin)
+    db: AsyncSession = Depends(get_async_db),
+    current_admin: Principal = Depends(get_current_admin)
 ):
     """重启指定实例的 Docker 容器"""
-    instance = db.query(Instance).filter(Instance.id == instance_id).first()
-    
-    if not instance:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="实例不存在"
-        )
+    instance = await _get_instance(db, instance_id)
     
     if not instance.container_id:
         raise HTTPException(
@@ -326,11 +323,13 @@ async def restart_instance_container(
         )
     
     try:
-        docker_service = DockerService()
-        docker_service.restart_container(instance.container_id)
+        docker_service = await run_in_threadpool(DockerService)
+        await run_in_threadpool(docker_service.restart_container, instance.container_id)
         
-        instance.container_status = "running"
-        db.commit()
+        # 状态经写缓冲合并落库
+        status_buffer.observe(instance.id, container_status=instance.container_status)
+        status_buffer.update(instance.id, container_status="running")
+        audit_log.record(current_admin, "instance.restart", "instance", instance_id)
         
         return {"message": "容器重启成功", "instance_id": instance_id}
         
@@ -344,17 +343,11 @@ async def restart_instance_container(
 @router.get("/instances/{instance_id}/config", summary="获取实例配置")
 async def get_instance_config(
     instance_id: int,
-    db: Session = Depends(get_db),
-    current_admin: User = Depends(get_current_admin)
+    db: AsyncSession = Depends(get_async_db),
+    current_admin: Principal = Depends(get_current_admin)
 ):
     """获取指定实例的 deploy.yaml 配置内容"""
-    instance = db.query(Instance).filter(Instance.id == instance_id).first()
-    
-    if not instance:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="实例不存在"
-        )
+    instance = await _get_instance(db, instance_id)
     
     if not instance.config_path:
         raise HTTPException(
@@ -385,17 +378,11 @@ async def get_instance_config(
 async def update_instance_config(
     instance_id: int,
     config_data: ConfigUpdate,
-    db: Session = Depends(get_db),
-    current_admin: User = Depends(get_current_admin)
+    db: AsyncSession = Depends(get_async_db),
+    current_admin: Principal = Depends(get_current_admin)
 ):
     """更新指定实例的 deploy.yaml 配置"""
-    instance = db.query(Instance).filter(Instance.id == instance_id).first()
-    
-    if not instance:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="实例不存在"
-        )
+    instance = await _get_instance(db, instance_id)
     
     if not instance.config_path:
         raise HTTPException(
@@ -417,6 +404,8 @@ async def update_instance_config(
     try:
         with open(config_file, 'w', encoding='utf-8') as f:
             f.write(config_data.content)
+        audit_log.record(current_admin, "instance.update_config", "instance", instance_id,
+                         size=len(config_data.content))
         return {"message": "配置更新成功", "instance_id": instance_id}
     except Exception as e:
         raise HTTPException(
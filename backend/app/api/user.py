@@ -1,19 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.database import get_db
-from app.schemas import UserResponse, UserChangePassword, InstanceResponse
-from app.models import User, Instance, UserInstance
+from app.schemas import UserResponse, UserChangePassword, InstanceResponse, InstanceChanges
+from app.models import User, Instance
 from app.core.security import verify_password, get_password_hash
 from app.core.deps import get_current_user
+from app.core.auth_cache import Principal, auth_cache
+from app.core.rate_limit import rate_limit
+from app.core.etag import check_etag, compute_etag
+from app.core.serialization import json_response
 from app.services import DockerService
+from app.services.status_buffer import status_buffer
+from app.services.audit_log import audit_log
+from app.services.instance_sync import InstanceSyncService
+from app.services.fleet_state import fleet_state
 
 router = APIRouter(prefix="/api/user", tags=["用户"])
 
 
 @router.get("/profile", response_model=UserResponse, summary="获取个人信息")
 def get_profile(
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """获取当前登录用户的个人信息"""
     return current_user
@@ -21,30 +29,43 @@ def get_profile(
 
 @router.get("/instances", response_model=List[InstanceResponse], summary="获取可访问的实例列表")
 def get_user_instances(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     获取当前用户可访问的所有实例
     
-    返回用户被分配的实例列表
+    返回用户被分配的实例列表；支持 If-None-Match，数据未变化时返回 304
     """
-    # 查询用户的实例关联
-    user_instances = db.query(UserInstance).filter(
-        UserInstance.user_id == current_user.id
-    ).all()
+    # 实例关联来自认证缓存，实例详情来自进程内实例状态表，不查询数据库
+    instance_ids = current_user.instance_ids
+    etag = compute_etag(request, sorted(instance_ids), fleet_state.version(instance_ids))
+    not_modified = check_etag(request, response, etag)
+    if not_modified:
+        return not_modified
     
-    # 获取实例详情
-    instance_ids = [ui.instance_id for ui in user_instances]
-    instances = db.query(Instance).filter(Instance.id.in_(instance_ids)).all()
+    return json_response(fleet_state.instances(instance_ids), response)
+
+
+@router.get("/instances/changes", response_model=InstanceChanges, summary="增量同步可访问的实例列表")
+def get_user_instance_changes(
+    since: Optional[str] = None,
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    返回自上次同步以来变化的实例
     
-    return instances
+    - **since**: 上次响应中的 cursor；不传、游标过期或实例分配变化时返回全部可访问实例（full 为 true）
+    """
+    return InstanceSyncService.changes(db, since, current_user.instance_ids)
 
 
 @router.put("/password", summary="修改密码")
 def change_password(
     password_data: UserChangePassword,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -53,24 +74,28 @@ def change_password(
     - **old_password**: 当前密码
     - **new_password**: 新密码
     """
+    user = db.query(User).filter(User.id == current_user.id).first()
+    
     # 验证原密码
-    if not verify_password(password_data.old_password, current_user.password_hash):
+    if not user or not verify_password(password_data.old_password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="原密码错误"
         )
     
     # 更新密码
-    current_user.password_hash = get_password_hash(password_data.new_password)
+    user.password_hash = get_password_hash(password_data.new_password)
     db.commit()
+    auth_cache.invalidate_user(user.id)
+    audit_log.record(current_user, "user.change_password", "user", user.id)
     
     return {"message": "密码修改成功"}
 
 
-@router.post("/instances/{instance_id}/restart", summary="重启实例容器")
+@router.post("/instances/{instance_id}/restart", summary="重启实例容器", dependencies=[Depends(rate_limit("restart"))])
 def restart_instance(
     instance_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -81,19 +106,17 @@ def restart_instance(
     只能重启已分配给当前用户的实例
     """
     # 检查用户是否有权访问该实例
-    user_instance = db.query(UserInstance).filter(
-        UserInstance.user_id == current_user.id,
-        UserInstance.instance_id == instance_id
-    ).first()
-    
-    if not user_instance:
+    if not current_user.can_access(instance_id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="您没有权限访问此实例"
         )
     
-    # 获取实例
-    instance = db.query(Instance).filter(Instance.id == instance_id).first()
+    # 获取实例（普通行），随即结束只读事务归还连接，重启容器期间不占用连接池
+    instance = db.query(
+        Instance.id, Instance.name, Instance.container_id, Instance.container_status
+    ).filter(Instance.id == instance_id).first()
+    db.rollback()
     
     if not instance:
         raise HTTPException(
@@ -111,8 +134,10 @@ def restart_instance(
         docker_service = DockerService()
         docker_service.restart_container(instance.container_id)
         
-        instance.container_status = "running"
-        db.commit()
+        # 状态经写缓冲合并落库
+        status_buffer.observe(instance.id, container_status=instance.container_status)
+        status_buffer.update(instance.id, container_status="running")
+        audit_log.record(current_user, "instance.restart", "instance", instance_id)
         
         return {
             "message": "容器重启成功",
@@ -7,6 +7,16 @@ class Settings(BaseSettings):
     
     # 数据库配置
     DATABASE_URL: str = "sqlite:///./app.db"
+    DB_POOL_SIZE: int = 10  # 连接池常驻连接数
+    DB_MAX_OVERFLOW: int = 20  # 连接池允许的额外连接数
+    DB_POOL_TIMEOUT: int = 30  # 获取连接的等待时间（秒）
+    
+    # SQLite 调优（连接建立时通过 PRAGMA 设置）
+    SQLITE_WAL: bool = True  # WAL 模式，读写互不阻塞
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # WAL 下 NORMAL 兼顾性能与安全
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000  # 写锁忙等待时间（毫秒）
+    SQLITE_CACHE_SIZE_KB: int = 16384  # 每个连接的页缓存大小（KiB）
+    SQLITE_MMAP_SIZE: int = 268435456  # 内存映射大小（字节）
     
     # JWT 配置
     SECRET_KEY: str = "your-secret-key-change-this-in-production"
@@ -14,6 +24,25 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
     
+    # 认证缓存配置（每个进程独立缓存，其他进程中的修改在 TTL 内生效）
+    AUTH_CACHE_TTL_SECONDS: int = 60
+    AUTH_CACHE_MAX_ENTRIES: int = 10000
+    TOKEN_CACHE_SIZE: int = 4096  # 已验证令牌缓存条数，0 表示关闭
+    
+    # 密码哈希配置
+    PASSWORD_HASH_WORKERS: int = 2  # bcrypt 进程池大小，0 表示在请求线程中执行
+    PASSWORD_HASH_MAX_PENDING: int = 16  # 同时等待哈希的请求上限，超过时返回 503
+    PASSWORD_HASH_CALIBRATE: bool = True  # 启动时按目标耗时校准 bcrypt cost
+    PASSWORD_HASH_TARGET_MS: int = 250  # 单次哈希的目标耗时（毫秒）
+    BCRYPT_ROUNDS: int = 12  # 未校准时使用的 bcrypt cost
+    BCRYPT_MIN_ROUNDS: int = 10
+    BCRYPT_MAX_ROUNDS: int = 14
+    
+    # 限流配置（各接口策略见 app/core/rate_limit.py）
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_TRUST_FORWARDED: bool = False  # 部署在反向代理后时按 X-Forwarded-For 识别客户端
+    RATE_LIMIT_EVICT_SECONDS: int = 60  # 清理空闲令牌桶的间隔（秒）
+    
     # CORS 配置
     CORS_ORIGINS: list = ["*"]
     
@@ -26,6 +55,62 @@ class Settings(BaseSettings):
     DOCKER_BASE_PATH: str = "/home/nero/alas"  # 配置文件基础路径
     DOCKER_CONTAINER_PREFIX: str = "alas"  # 容器名前缀
     DOCKER_SSH_SERVER: str = "app.hk1.azurlane.cloud:10022"  # SSH 服务器地址
+    
+    # 健康检查配置
+    HEALTH_CHECK_TIMEOUT: float = 5.0  # 单次探测超时（秒）
+    HEALTH_CHECK_CONCURRENCY: int = 50  # 同时进行的探测数量上限
+    HEALTH_CHECK_MAX_CONNECTIONS: int = 100  # 探测客户端连接池上限
+    HEALTH_CHECK_MAX_KEEPALIVE: int = 50  # 保持活动的空闲连接数
+    HEALTH_CHECK_KEEPALIVE_EXPIRY: float = 120.0  # 空闲连接保持时间（秒）
+    HEALTH_CHECK_HTTP2: bool = False  # 是否启用 HTTP/2（需要安装 h2）
+    HEALTH_CHECK_LOCAL_MODE: str = "off"  # 本地探测方式：host（主机端口）、container（容器网络）、off（关闭）；需确认后端能访问到对应地址后再开启
+    HEALTH_CHECK_LOCAL_HOST: str = "127.0.0.1"  # host 模式下访问主机端口的地址（后端在容器内部署时需改为宿主机地址，如 172.17.0.1）
+    HEALTH_CHECK_LOCAL_TIMEOUT: float = 2.0  # 本地探测超时（秒）
+    HEALTH_CHECK_TUNNEL_INTERVAL_SECONDS: int = 300  # 公网隧道探测间隔（秒），本地探测每轮执行
+    
+    # 健康检查历史配置
+    HEALTH_HISTORY_RAW_RETENTION_HOURS: int = 48  # 原始记录保留时长（小时，实际至少保留 24 小时 + 汇总宽限期 + 一个压缩间隔）
+    HEALTH_HISTORY_HOURLY_RETENTION_DAYS: int = 30  # 小时汇总保留天数
+    HEALTH_HISTORY_DAILY_RETENTION_DAYS: int = 365  # 天汇总保留天数
+    HEALTH_HISTORY_COMPACT_INTERVAL_MINUTES: int = 10  # 压缩任务执行间隔（分钟）
+    HEALTH_HISTORY_ROLLUP_GRACE_SECONDS: int = 600  # 周期结束后等待多久再汇总（秒），需大于一轮健康检查的耗时，等待延迟提交的记录
+    
+    # 后台任务选主配置（多 worker 时每个任务只由一个进程执行）
+    LEADER_LEASE_TTL_SECONDS: int = 30  # 租约有效期，过期后其他进程可接管
+    LEADER_HEARTBEAT_SECONDS: int = 10  # 续约/抢占间隔，应明显小于租约有效期
+    
+    # 实例状态写缓冲配置
+    STATUS_BUFFER_FLUSH_SECONDS: float = 2.0  # 批量落库间隔（秒）
+    STATUS_BUFFER_TIMESTAMP_RESOLUTION_SECONDS: int = 300  # 状态未变化时检查时间的落库粒度（秒）
+    
+    # 用户批量导入导出配置
+    USER_IMPORT_BATCH_SIZE: int = 200  # 每个事务写入的用户数（同时也是一次并行哈希的数量）
+    USER_IMPORT_MAX_ROWS: int = 50000  # 单次导入的最大行数
+    USER_EXPORT_BATCH_SIZE: int = 1000  # 导出时每次从数据库读取的用户数
+    
+    # 审计日志配置
+    AUDIT_LOG_FLUSH_SECONDS: float = 1.0  # 后台批量写入间隔（秒）
+    AUDIT_LOG_BATCH_SIZE: int = 500  # 每个事务写入的最大条数
+    AUDIT_LOG_MAX_PENDING: int = 100000  # 内存中等待写入的上限，超过时丢弃并计数
+    AUDIT_LOG_RETENTION_DAYS: int = 180  # 保留天数
+    AUDIT_LOG_PURGE_INTERVAL_MINUTES: int = 60  # 过期清理间隔（分钟）
+    
+    # 实例增量同步配置
+    INSTANCE_SYNC_OVERLAP_SECONDS: int = 5  # 游标时间向前重叠的秒数，覆盖游标生成时尚未提交的写入
+    INSTANCE_SYNC_TOMBSTONE_RETENTION_HOURS: int = 24  # 删除记录保留时长（小时），更早的游标需要全量同步
+    INSTANCE_SYNC_PURGE_INTERVAL_MINUTES: int = 60  # 删除记录清理间隔（分钟）
+    
+    # 仪表盘配置
+    DASHBOARD_FAILURE_WINDOW_HOURS: int = 24  # 统计最近探测失败的时间窗口（小时）
+    DASHBOARD_RECENT_FAILURES: int = 20  # 返回的失败实例数量上限
+    
+    # 进程内实例状态表配置
+    FLEET_STATE_SYNC_SECONDS: float = 2.0  # 从数据库增量同步其他 worker 写入的间隔（秒）
+    DOCKER_EVENTS_RETRY_MAX_SECONDS: int = 60  # Docker 事件流断开后重连的最大等待时间（秒）
+    
+    # 响应压缩配置
+    GZIP_MINIMUM_SIZE: int = 1024  # 超过该字节数的响应才压缩
+    GZIP_COMPRESS_LEVEL: int = 5  # 压缩级别（1-9，越大越慢）
 
     
     class Config:
@@ -1,18 +1,28 @@
 from app.core.security import (
     verify_password,
     get_password_hash,
+    password_needs_rehash,
     create_access_token,
     create_refresh_token,
-    decode_token
+    decode_token,
+    token_cache_stats
 )
 from app.core.deps import get_current_user, get_current_admin
+from app.core.auth_cache import Principal, auth_cache
+from app.core.password_hasher import password_hasher, PasswordHasherBusy
 
 __all__ = [
     "verify_password",
     "get_password_hash",
+    "password_needs_rehash",
     "create_access_token",
     "create_refresh_token",
     "decode_token",
+    "token_cache_stats",
     "get_current_user",
-    "get_current_admin"
+    "get_current_admin",
+    "Principal",
+    "auth_cache",
+    "password_hasher",
+    "PasswordHasherBusy"
 ]
@@ -0,0 +1,93 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, FrozenSet, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models import User, UserInstance, UserRole
+import threading
+import time
+
+
+@dataclass(frozen=True)
+class Principal:
+    """已认证用户的只读快照（可跨请求缓存）"""
+    id: int
+    username: str
+    role: UserRole
+    created_at: datetime
+    updated_at: datetime
+    instance_ids: FrozenSet[int]
+
+    def can_access(self, instance_id: int) -> bool:
+        """是否被分配了指定实例"""
+        return instance_id in self.instance_ids
+
+
+class AuthCache:
+    """
+    认证主体缓存
+
+    按用户名缓存 Principal 及其可访问的实例集合，条目在 TTL 到期后重新加载；
+    用户信息或实例分配变化时由管理接口显式失效。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[Principal, float]] = {}
+
+    def get(self, db: Session, username: str) -> Optional[Principal]:
+        """获取用户主体，缓存未命中或过期时从数据库加载"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(username)
+            if entry is not None and entry[1] > now:
+                return entry[0]
+
+        principal = self._load(db, username)
+        if principal is None:
+            return None
+
+        with self._lock:
+            if len(self._entries) >= settings.AUTH_CACHE_MAX_ENTRIES:
+                self._entries.clear()
+            self._entries[username] = (principal, now + settings.AUTH_CACHE_TTL_SECONDS)
+        return principal
+
+    @staticmethod
+    def _load(db: Session, username: str) -> Optional[Principal]:
+        user = db.query(
+            User.id, User.username, User.role, User.created_at, User.updated_at
+        ).filter(User.username == username).first()
+        if user is None:
+            return None
+
+        instance_ids = db.query(UserInstance.instance_id).filter(UserInstance.user_id == user.id).all()
+        return Principal(
+            id=user.id,
+            username=user.username,
+            role=user.role,
+            created_at=user.created_at,
+            updated_at=user.updated_at,
+            instance_ids=frozenset(row.instance_id for row in instance_ids),
+        )
+
+    def invalidate_user(self, user_id: int):
+        """失效指定用户的缓存（用户被修改、删除或实例分配变化时调用）"""
+        with self._lock:
+            for username, (principal, _) in list(self._entries.items()):
+                if principal.id == user_id:
+                    del self._entries[username]
+
+    def stats(self) -> Dict[str, int]:
+        """缓存条目统计"""
+        with self._lock:
+            return {"size": len(self._entries), "max_size": settings.AUTH_CACHE_MAX_ENTRIES}
+
+    def invalidate_all(self):
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+
+
+# 进程内共享的认证缓存
+auth_cache = AuthCache()
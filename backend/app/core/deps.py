@@ -4,7 +4,8 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.core.security import decode_token
-from app.models import User, UserRole
+from app.core.auth_cache import Principal, auth_cache
+from app.models import UserRole
 
 security = HTTPBearer()
 
@@ -12,8 +13,8 @@ security = HTTPBearer()
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
-) -> User:
-    """获取当前登录用户"""
+) -> Principal:
+    """获取当前登录用户（命中缓存时不查询数据库）"""
     token = credentials.credentials
     payload = decode_token(token)
     
@@ -39,7 +40,7 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user = db.query(User).filter(User.username == username).first()
+    user = auth_cache.get(db, username)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -51,8 +52,8 @@ def get_current_user(
 
 
 def get_current_admin(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: Principal = Depends(get_current_user)
+) -> Principal:
     """获取当前管理员用户"""
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(
@@ -0,0 +1,40 @@
+from datetime import datetime
+from typing import Any, Optional
+from fastapi import Request, Response, status
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+import hashlib
+
+
+def table_version(db: Session, model, *criteria) -> str:
+    """
+    数据版本：行数与最大 updated_at
+
+    新增、修改会推进 updated_at，删除会减少行数；只需一次聚合查询
+    （max 走 updated_at 索引），不读取任何行内容。
+    """
+    query = db.query(func.count(model.id), func.max(model.updated_at))
+    if criteria:
+        query = query.filter(*criteria)
+    count, latest = query.one()
+    return f"{count}:{latest.isoformat() if isinstance(latest, datetime) else latest}"
+
+
+def compute_etag(request: Request, *parts: Any) -> str:
+    """由数据版本和查询参数计算 ETag（弱校验，压缩后的响应同样适用）"""
+    raw = "|".join([request.url.path, str(request.query_params)] + [str(part) for part in parts])
+    return 'W/"' + hashlib.sha1(raw.encode()).hexdigest()[:20] + '"'
+
+
+def check_etag(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """
+    设置 ETag 响应头；If-None-Match 与之匹配时返回 304 响应（调用方直接返回，不再查询和序列化）
+    """
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        candidates = {tag.strip() for tag in if_none_match.split(",")}
+        if etag in candidates or "*" in candidates:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
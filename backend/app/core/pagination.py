@@ -0,0 +1,84 @@
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+from fastapi import HTTPException, Response, status
+from sqlalchemy import tuple_
+import base64
+import json
+
+
+# 列表接口支持的排序键（均有包含 id 的联合索引），前缀 "-" 表示降序
+SORT_PATTERN = "^-?(id|updated_at)$"
+
+# 下一页游标通过响应头返回，响应体保持为列表
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(sort: str, value: Any, last_id: int) -> str:
+    """将上一页最后一行的排序值编码为游标"""
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([sort, value, last_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> Tuple[Any, int]:
+    """解析游标，游标与当前排序方式不一致或格式错误时返回 400"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, value, last_id = json.loads(base64.urlsafe_b64decode(padded))
+        if cursor_sort != sort:
+            raise ValueError("sort mismatch")
+        if sort.lstrip("-").endswith("_at"):
+            value = datetime.fromisoformat(value)
+        return value, int(last_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="无效的分页游标"
+        )
+
+
+def keyset_page(query, model, sort: str, cursor: Optional[str], limit: int) -> Tuple[List[Any], Optional[str]]:
+    """
+    按 (排序键, id) 做游标分页
+
+    每页都从索引中直接定位到上一页末尾，耗时与翻到第几页无关。
+
+    Returns:
+        (当前页的行, 下一页游标；没有更多数据时为 None)
+    """
+    descending = sort.startswith("-")
+    field = sort.lstrip("-")
+    column = getattr(model, field)
+
+    if cursor:
+        value, last_id = decode_cursor(cursor, sort)
+        if field == "id":
+            query = query.filter(model.id < last_id if descending else model.id > last_id)
+        else:
+            key = tuple_(column, model.id)
+            query = query.filter(key < (value, last_id) if descending else key > (value, last_id))
+
+    if field == "id":
+        order = [model.id.desc() if descending else model.id]
+    else:
+        order = [column.desc(), model.id.desc()] if descending else [column, model.id]
+
+    # 多取一行判断是否还有下一页
+    rows = query.order_by(*order).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(sort, getattr(last, field), last.id)
+
+
+def prefix_filter(column, prefix: str):
+    """前缀匹配（区间条件，可使用索引；LIKE 在 SQLite 中默认不区分大小写，无法走普通索引）"""
+    return (column >= prefix) & (column < prefix + "\U0010ffff")
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]):
+    """在响应头中返回下一页游标"""
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
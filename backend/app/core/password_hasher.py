@@ -0,0 +1,124 @@
+import bcrypt
+import math
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import List, Optional
+from app.config import settings
+
+
+class PasswordHasherBusy(Exception):
+    """密码哈希队列已满"""
+    pass
+
+
+def _truncate_password(password: str) -> str:
+    """截断密码以符合bcrypt的72字节限制"""
+    password_bytes = password.encode('utf-8')
+    if len(password_bytes) > 72:
+        password = password_bytes[:72].decode('utf-8', errors='ignore')
+    return password
+
+
+def _hash_worker(password: str, rounds: int) -> str:
+    """在进程池中执行：生成密码哈希"""
+    password = _truncate_password(password)
+    hashed = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=rounds))
+    return hashed.decode('utf-8')
+
+
+def _verify_worker(password: str, hashed_password: str) -> bool:
+    """在进程池中执行：校验密码"""
+    try:
+        password = _truncate_password(password)
+        return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+    except Exception:
+        return False
+
+
+def _calibrate_worker(target_ms: float, min_rounds: int, max_rounds: int) -> int:
+    """在进程池中执行：选出耗时不超过目标值的最大 bcrypt cost"""
+    started = time.perf_counter()
+    bcrypt.hashpw(b"calibration", bcrypt.gensalt(rounds=min_rounds))
+    elapsed_ms = max((time.perf_counter() - started) * 1000, 0.001)
+    # cost 每增加 1，耗时翻倍
+    rounds = min_rounds + int(math.floor(math.log2(max(target_ms / elapsed_ms, 1))))
+    return max(min_rounds, min(rounds, max_rounds))
+
+
+class PasswordHasher:
+    """
+    bcrypt 进程池
+
+    哈希运算在独立进程中执行，不占用请求线程的 CPU；
+    排队数量有上限，超过时直接拒绝（PasswordHasherBusy），避免登录高峰拖垮其他接口。
+    """
+
+    def __init__(self):
+        self.rounds = settings.BCRYPT_ROUNDS
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._slots = threading.BoundedSemaphore(max(1, settings.PASSWORD_HASH_MAX_PENDING))
+
+    def start(self):
+        """启动进程池并校准 bcrypt cost（应用启动时调用）"""
+        if self._pool is None and settings.PASSWORD_HASH_WORKERS > 0:
+            self._pool = ProcessPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        if settings.PASSWORD_HASH_CALIBRATE:
+            self.rounds = self._run(
+                _calibrate_worker,
+                settings.PASSWORD_HASH_TARGET_MS,
+                settings.BCRYPT_MIN_ROUNDS,
+                settings.BCRYPT_MAX_ROUNDS
+            )
+            print(f"✓ bcrypt cost 校准为 {self.rounds}（目标 {settings.PASSWORD_HASH_TARGET_MS}ms）")
+
+    def shutdown(self):
+        """关闭进程池"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy()
+        try:
+            if self._pool is None:
+                return fn(*args)
+            return self._pool.submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, password: str) -> str:
+        """生成密码哈希"""
+        return self._run(_hash_worker, password, self.rounds)
+
+    def hash_many(self, passwords: List[str]) -> List[str]:
+        """批量生成密码哈希（分散到所有工作进程并行执行，整批只占用一个排队名额）"""
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy()
+        try:
+            if self._pool is None:
+                return [_hash_worker(password, self.rounds) for password in passwords]
+            return list(self._pool.map(_hash_worker, passwords, repeat(self.rounds)))
+        finally:
+            self._slots.release()
+
+    def verify(self, password: str, hashed_password: str) -> bool:
+        """校验密码"""
+        return self._run(_verify_worker, password, hashed_password)
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """哈希的 cost 低于当前配置时需要重新哈希"""
+        try:
+            return int(hashed_password.split('$')[2]) < self.rounds
+        except (IndexError, ValueError):
+            return False
+
+
+# 进程内共享的密码哈希器
+password_hasher = PasswordHasher()
@@ -0,0 +1,140 @@
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+from fastapi import Depends, HTTPException, Request, status
+from app.config import settings
+from app.core.auth_cache import Principal
+from app.core.deps import get_current_user
+import math
+import threading
+import time
+
+
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    """限流策略：令牌桶容量、每秒补充的令牌数，以及限流键的组成"""
+    capacity: float
+    refill_per_second: float
+    key_by: Tuple[str, ...]  # ip / user / instance
+
+
+# 各接口的限流策略
+POLICIES: Dict[str, RateLimitPolicy] = {
+    # 登录：同一 IP 每分钟 10 次；同一 IP 对同一用户名每分钟失败 5 次（只计失败，键由登录接口拼接用户名）
+    "login": RateLimitPolicy(capacity=10, refill_per_second=10 / 60, key_by=("ip",)),
+    "login_user": RateLimitPolicy(capacity=5, refill_per_second=5 / 60, key_by=("ip",)),
+    # 用户重启实例：同一用户对同一实例每分钟 2 次
+    "restart": RateLimitPolicy(capacity=2, refill_per_second=2 / 60, key_by=("user", "instance")),
+    # 管理员容器操作：同一实例每分钟 6 次
+    "container_action": RateLimitPolicy(capacity=6, refill_per_second=6 / 60, key_by=("instance",)),
+    # 部署：同一实例每 5 分钟 1 次
+    "deploy": RateLimitPolicy(capacity=1, refill_per_second=1 / 300, key_by=("instance",)),
+}
+
+
+class _Bucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, tokens: float, updated: float):
+        self.tokens = tokens
+        self.updated = updated
+
+
+class RateLimiter:
+    """进程内令牌桶限流器，每次判断 O(1)，空闲的桶定期清理"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets: Dict[Tuple[str, str], _Bucket] = {}
+
+    def hit(self, policy_name: str, key: str, consume: bool = True) -> Optional[float]:
+        """
+        消耗一个令牌（consume 为 False 时只检查是否还有令牌，不消耗）
+
+        Returns:
+            None 表示放行，否则为需要等待的秒数
+        """
+        policy = POLICIES[policy_name]
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get((policy_name, key))
+            if bucket is None:
+                if not consume:
+                    return None
+                bucket = self._buckets[(policy_name, key)] = _Bucket(policy.capacity, now)
+            else:
+                bucket.tokens = min(
+                    policy.capacity,
+                    bucket.tokens + (now - bucket.updated) * policy.refill_per_second
+                )
+                bucket.updated = now
+
+            if bucket.tokens >= 1:
+                if consume:
+                    bucket.tokens -= 1
+                return None
+            return (1 - bucket.tokens) / policy.refill_per_second
+
+    def evict_idle(self) -> int:
+        """清理已回满的桶（与新建的桶等价），由调度器周期调用"""
+        now = time.monotonic()
+        with self._lock:
+            idle = [
+                key for key, bucket in self._buckets.items()
+                if (now - bucket.updated) * POLICIES[key[0]].refill_per_second
+                + bucket.tokens >= POLICIES[key[0]].capacity
+            ]
+            for key in idle:
+                del self._buckets[key]
+        return len(idle)
+
+
+# 进程内共享的限流器
+rate_limiter = RateLimiter()
+
+
+def client_ip(request: Request) -> str:
+    """获取客户端 IP（可选信任反向代理的 X-Forwarded-For）"""
+    if settings.RATE_LIMIT_TRUST_FORWARDED:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def enforce(policy_name: str, key: str, consume: bool = True):
+    """按策略限流，超出时返回 429 及 Retry-After（consume 为 False 时只检查，不消耗令牌）"""
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+    retry_after = rate_limiter.hit(policy_name, key, consume)
+    if retry_after is not None:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="请求过于频繁，请稍后重试",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+        )
+
+
+def _build_key(policy: RateLimitPolicy, request: Request, user: Optional[Principal]) -> str:
+    parts = []
+    for part in policy.key_by:
+        if part == "ip":
+            parts.append(client_ip(request))
+        elif part == "user":
+            parts.append(str(user.id))
+        elif part == "instance":
+            parts.append(str(request.path_params.get("instance_id")))
+    return ":".join(parts)
+
+
+def rate_limit(policy_name: str) -> Callable:
+    """生成限流依赖，用于路由的 dependencies 参数"""
+    policy = POLICIES[policy_name]
+
+    if "user" in policy.key_by:
+        def dependency(request: Request, current_user: Principal = Depends(get_current_user)):
+            enforce(policy_name, _build_key(policy, request, current_user))
+    else:
+        def dependency(request: Request):
+            enforce(policy_name, _build_key(policy, request, None))
+
+    return dependency
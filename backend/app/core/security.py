@@ -1,38 +1,82 @@
-import bcrypt
+import hashlib
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, Optional, Tuple
 from jose import JWTError, jwt
 from app.config import settings
+from app.core.password_hasher import password_hasher
 
 
-def _truncate_password(password: str) -> str:
-    """截断密码以符合bcrypt的72字节限制"""
-    password_bytes = password.encode('utf-8')
-    if len(password_bytes) > 72:
-        password = password_bytes[:72].decode('utf-8', errors='ignore')
-    return password
+class _VerifiedTokenCache:
+    """已验证令牌的 LRU 缓存：键为令牌摘要，值为载荷与过期时间"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[bytes, Tuple[dict, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, token: str) -> Optional[dict]:
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            payload, exp = entry
+            if exp <= time.time():
+                # 过期即淘汰，交由完整校验返回失败
+                del self._entries[key]
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(payload)
+
+    def put(self, token: str, payload: dict):
+        exp = payload.get("exp")
+        if not isinstance(exp, (int, float)) or settings.TOKEN_CACHE_SIZE <= 0:
+            return
+        with self._lock:
+            self._entries[self._key(token)] = (dict(payload), float(exp))
+            while len(self._entries) > settings.TOKEN_CACHE_SIZE:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": settings.TOKEN_CACHE_SIZE,
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+            }
+
+
+_token_cache = _VerifiedTokenCache()
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """验证密码"""
-    try:
-        # bcrypt 限制密码不能超过 72 字节，需要截断
-        plain_password = _truncate_password(plain_password)
-        return bcrypt.checkpw(
-            plain_password.encode('utf-8'), 
-            hashed_password.encode('utf-8')
-        )
-    except Exception:
-        return False
+    """验证密码（在进程池中执行，队列满时抛出 PasswordHasherBusy）"""
+    return password_hasher.verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    """加密密码"""
-    # bcrypt 限制密码不能超过 72 字节，需要截断
-    password = _truncate_password(password)
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-    return hashed.decode('utf-8')
+    """加密密码（在进程池中执行，队列满时抛出 PasswordHasherBusy）"""
+    return password_hasher.hash(password)
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """密码哈希的 cost 是否已过时"""
+    return password_hasher.needs_rehash(hashed_password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -58,9 +102,18 @@ def create_refresh_token(data: dict) -> str:
 
 
 def decode_token(token: str) -> Optional[dict]:
-    """解码令牌"""
+    """解码令牌（已验证过的令牌在过期前直接从缓存返回）"""
+    payload = _token_cache.get(token)
+    if payload is not None:
+        return payload
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
     except JWTError:
         return None
+    _token_cache.put(token, payload)
+    return payload
+
+
+def token_cache_stats() -> Dict[str, int]:
+    """令牌缓存命中统计"""
+    return _token_cache.stats()
@@ -0,0 +1,29 @@
+from typing import Any, Optional, Tuple
+from fastapi import Response, status
+import orjson
+
+
+def response_columns(model, schema) -> Tuple[Any, ...]:
+    """按响应模型的字段顺序取出模型中对应的列（不是列的字段由调用方补充）"""
+    columns = model.__table__.columns
+    return tuple(getattr(model, name) for name in schema.model_fields if name in columns)
+
+
+def json_response(content: Any, response: Optional[Response] = None,
+                  status_code: int = status.HTTP_200_OK) -> Response:
+    """
+    将查询出的普通行数据直接编码为 JSON 字节返回
+
+    跳过响应模型的逐行构造与校验，用于大列表接口；内容需与 response_model 的输出一致
+    （datetime 输出 ISO 格式，枚举输出其值）。response 为接口注入的 Response，
+    其中已设置的响应头（分页游标、ETag 等）会一并返回。
+    """
+    headers = None
+    if response is not None:
+        headers = {key: value for key, value in response.headers.items() if key != "content-length"}
+    return Response(
+        content=orjson.dumps(content),
+        status_code=status_code,
+        media_type="application/json",
+        headers=headers
+    )
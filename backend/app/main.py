@@ -1,9 +1,21 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse
 from app.config import settings
-from app.database import init_db, SessionLocal
+from app.database import SessionLocal, async_engine
 from app.api import auth_router, admin_router, user_router, docker_router
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.password_hasher import password_hasher, PasswordHasherBusy
+from app.core.rate_limit import rate_limiter
 from app.services.health_checker import HealthCheckService
+from app.services.health_history import HealthHistoryService
+from app.services.leader_election import LeaderElection
+from app.services.status_buffer import status_buffer
+from app.services.audit_log import audit_log
+from app.services.instance_sync import InstanceSyncService
+from app.services.fleet_state import fleet_state
+from app.services.docker_events import DockerEventWatcher
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from contextlib import asynccontextmanager
 
@@ -11,30 +23,15 @@ from contextlib import asynccontextmanager
 def on_startup():
     """应用启动时初始化数据库"""
     from app.models import User, UserRole
-    from sqlalchemy import text
     import bcrypt
     
-    # 初始化数据库表结构
-    init_db()
-    
-    # 自动迁移：添加健康检查字段
+    # 初始化表结构并执行尚未执行的迁移（已是最新版本时只查询一次版本号）
     from app.database import engine
-    with engine.connect() as connection:
-        try:
-            connection.execute(text("ALTER TABLE instances ADD COLUMN health_status VARCHAR(50) DEFAULT 'unknown'"))
-            connection.commit()
-            print("✓ 已添加 health_status 列")
-        except Exception as e:
-            if "duplicate column" not in str(e).lower() and "already exists" not in str(e).lower():
-                print(f"⚠ health_status 列可能已存在: {e}")
-        
-        try:
-            connection.execute(text("ALTER TABLE instances ADD COLUMN last_health_check DATETIME"))
-            connection.commit()
-            print("✓ 已添加 last_health_check 列")
-        except Exception as e:
-            if "duplicate column" not in str(e).lower() and "already exists" not in str(e).lower():
-                print(f"⚠ last_health_check 列可能已存在: {e}")
+    from app.services.migrations import run_migrations
+    run_migrations(engine)
+    
+    # 加载进程内实例状态表
+    fleet_state.load()
     
     # 检查并创建默认管理员账号
     db = SessionLocal()
@@ -67,26 +64,75 @@ def on_startup():
 # 创建调度器
 scheduler = AsyncIOScheduler()
 
+# 后台任务选主：多个 worker 中每个任务只由持有租约的进程执行
+leader = LeaderElection([
+    "health_check", "health_history_compact", "audit_log_purge", "instance_tombstone_purge", "docker_events"
+])
+
+# Docker 容器事件订阅：每个进程更新自己的状态表，持有租约的进程负责落库
+docker_events = DockerEventWatcher(lambda: leader.is_leader("docker_events"))
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # 启动时执行
     on_startup()
     
+    # 启动密码哈希进程池并校准 bcrypt cost
+    password_hasher.start()
+    
+    # 创建健康检查共享的长连接客户端
+    await HealthCheckService.start_client()
+    
+    # 先竞争一次租约，再启动调度器
+    leader.heartbeat()
+    
     # 启动调度器
-    scheduler.add_job(HealthCheckService.check_all_instances, 'interval', minutes=1, id='health_check')
+    scheduler.add_job(leader.heartbeat, 'interval', seconds=settings.LEADER_HEARTBEAT_SECONDS, id='leader_heartbeat')
+    scheduler.add_job(status_buffer.flush, 'interval', seconds=settings.STATUS_BUFFER_FLUSH_SECONDS, id='status_buffer_flush')
+    scheduler.add_job(audit_log.flush, 'interval', seconds=settings.AUDIT_LOG_FLUSH_SECONDS, id='audit_log_flush')
+    scheduler.add_job(fleet_state.sync, 'interval', seconds=settings.FLEET_STATE_SYNC_SECONDS, id='fleet_state_sync')
+    scheduler.add_job(rate_limiter.evict_idle, 'interval', seconds=settings.RATE_LIMIT_EVICT_SECONDS, id='rate_limit_evict')
+    scheduler.add_job(
+        leader.guard('health_check', HealthCheckService.check_all_instances), 'interval',
+        minutes=1, id='health_check'
+    )
+    scheduler.add_job(
+        leader.guard('health_history_compact', HealthHistoryService.compact), 'interval',
+        minutes=settings.HEALTH_HISTORY_COMPACT_INTERVAL_MINUTES, id='health_history_compact'
+    )
+    scheduler.add_job(
+        leader.guard('audit_log_purge', audit_log.purge), 'interval',
+        minutes=settings.AUDIT_LOG_PURGE_INTERVAL_MINUTES, id='audit_log_purge'
+    )
+    scheduler.add_job(
+        leader.guard('instance_tombstone_purge', InstanceSyncService.purge), 'interval',
+        minutes=settings.INSTANCE_SYNC_PURGE_INTERVAL_MINUTES, id='instance_tombstone_purge'
+    )
     scheduler.start()
     print("✓ 定时任务调度器已启动")
     
-    # 立即执行一次健康检查
+    docker_events.start()
+    
+    # 立即执行一次健康检查（仅持有租约的进程）
     import asyncio
-    asyncio.create_task(HealthCheckService.check_all_instances())
+    if leader.is_leader('health_check'):
+        asyncio.create_task(HealthCheckService.check_all_instances())
     
     yield
     
     # 关闭时执行
+    docker_events.stop()
     scheduler.shutdown()
     print("✓ 定时任务调度器已关闭")
+    
+    # 落库尚未写入的实例状态和审计日志
+    status_buffer.flush()
+    audit_log.flush()
+    leader.release()
+    await HealthCheckService.close_client()
+    password_hasher.shutdown()
+    await async_engine.dispose()
 
 
 # 创建 FastAPI 应用
@@ -106,8 +152,22 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
+# 超过阈值的响应按客户端 Accept-Encoding 进行 gzip 压缩
+app.add_middleware(GZipMiddleware, minimum_size=settings.GZIP_MINIMUM_SIZE, compresslevel=settings.GZIP_COMPRESS_LEVEL)
+
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    """密码哈希队列已满时返回 503"""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "服务繁忙，请稍后重试"},
+        headers={"Retry-After": "1"}
+    )
+
+
 # 注册路由
 app.include_router(auth_router)
 app.include_router(admin_router)
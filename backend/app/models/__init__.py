@@ -1,5 +1,14 @@
 from app.models.user import User, UserRole
 from app.models.instance import Instance
 from app.models.user_instance import UserInstance
+from app.models.health_check import HealthCheckRecord, HealthCheckRollup
+from app.models.scheduler_lease import SchedulerLease
+from app.models.schema_version import SchemaVersion
+from app.models.audit_log import AuditLog
+from app.models.instance_tombstone import InstanceTombstone
 
-__all__ = ["User", "UserRole", "Instance", "UserInstance"]
+__all__ = [
+    "User", "UserRole", "Instance", "UserInstance",
+    "HealthCheckRecord", "HealthCheckRollup", "SchedulerLease", "SchemaVersion", "AuditLog",
+    "InstanceTombstone"
+]
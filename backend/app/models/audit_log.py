@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index
+from datetime import datetime
+from app.database import Base
+
+
+class AuditLog(Base):
+    """审计日志模型（只追加，按保留期清理）"""
+    __tablename__ = "audit_logs"
+    __table_args__ = (
+        Index("ix_audit_logs_created_at", "created_at"),
+        Index("ix_audit_logs_actor_time", "actor_id", "created_at"),
+        Index("ix_audit_logs_target_time", "target_type", "target_id", "created_at"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)  # 操作时间
+    actor_id = Column(Integer, nullable=True)  # 操作者用户 ID（用户删除后保留记录，不设外键）
+    actor_username = Column(String(50), nullable=True)  # 操作者用户名
+    action = Column(String(50), nullable=False)  # 操作，如 user.create、instance.deploy
+    target_type = Column(String(50), nullable=True)  # 操作对象类型：user、instance
+    target_id = Column(Integer, nullable=True)  # 操作对象 ID
+    detail = Column(Text, nullable=True)  # 操作详情（JSON）
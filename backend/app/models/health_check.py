@@ -0,0 +1,43 @@
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Index, UniqueConstraint, text
+from datetime import datetime
+from app.database import Base
+
+
+class HealthCheckRecord(Base):
+    """健康检查原始记录（每次探测一行）"""
+    __tablename__ = "health_checks"
+    
+    id = Column(Integer, primary_key=True)
+    instance_id = Column(Integer, ForeignKey("instances.id", ondelete="CASCADE"), nullable=False)
+    checked_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    healthy = Column(Boolean, nullable=False)
+    latency_ms = Column(Integer, nullable=True)  # 响应耗时（毫秒），失败时为空
+    
+    __table_args__ = (
+        Index("ix_health_checks_instance_time", "instance_id", "checked_at"),
+        Index("ix_health_checks_checked_at", "checked_at"),
+        # 仅包含失败记录的部分索引，用于仪表盘统计最近失败（不支持部分索引的数据库为普通索引）
+        Index(
+            "ix_health_checks_failures", "checked_at", "instance_id",
+            sqlite_where=text("healthy IS 0"), postgresql_where=text("healthy IS false")
+        ),
+    )
+
+
+class HealthCheckRollup(Base):
+    """健康检查汇总记录（按小时/按天）"""
+    __tablename__ = "health_check_rollups"
+    
+    id = Column(Integer, primary_key=True)
+    instance_id = Column(Integer, ForeignKey("instances.id", ondelete="CASCADE"), nullable=False)
+    period = Column(String(10), nullable=False)  # hour, day
+    bucket_start = Column(DateTime, nullable=False)
+    total = Column(Integer, nullable=False, default=0)
+    success = Column(Integer, nullable=False, default=0)
+    p50_ms = Column(Integer, nullable=True)
+    p95_ms = Column(Integer, nullable=True)
+    
+    __table_args__ = (
+        UniqueConstraint("instance_id", "period", "bucket_start", name="uq_health_rollup_bucket"),
+        Index("ix_health_rollups_period_bucket", "period", "bucket_start"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -7,10 +7,17 @@ from app.database import Base
 class Instance(Base):
     """实例模型"""
     __tablename__ = "instances"
+    __table_args__ = (
+        # 列表接口的游标分页、筛选和前缀搜索
+        Index("ix_instances_updated_at_id", "updated_at", "id"),
+        Index("ix_instances_health_status_id", "health_status", "id"),
+        Index("ix_instances_container_status_id", "container_status", "id"),
+        Index("ix_instances_name", "name"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), nullable=False)
-    url = Column(String(500), nullable=True)
+    url = Column(String(500), nullable=True, index=True)
     description = Column(Text, nullable=True)
     
     # Docker 容器信息
@@ -23,6 +30,9 @@ class Instance(Base):
     # 健康检查信息
     health_status = Column(String(50), default="unknown")  # healthy, unhealthy, unknown
     last_health_check = Column(DateTime, nullable=True)    # 上次检查时间
+    local_health_status = Column(String(50), default="unknown")  # 容器 Web UI（本地网络）状态
+    tunnel_health_status = Column(String(50), default="unknown")  # 公网隧道 URL 状态
+    last_tunnel_check = Column(DateTime, nullable=True)  # 上次隧道检查时间
     
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, DateTime
+from datetime import datetime
+from app.database import Base
+
+
+class InstanceTombstone(Base):
+    """已删除实例的记录（供增量同步返回删除列表，按保留期清理）"""
+    __tablename__ = "instance_tombstones"
+    
+    id = Column(Integer, primary_key=True)
+    instance_id = Column(Integer, nullable=False)  # 被删除的实例 ID
+    deleted_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)  # 删除时间
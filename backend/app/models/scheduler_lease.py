@@ -0,0 +1,13 @@
+from sqlalchemy import Column, String, DateTime
+from datetime import datetime
+from app.database import Base
+
+
+class SchedulerLease(Base):
+    """后台任务租约模型（多进程下每个任务只由一个进程执行）"""
+    __tablename__ = "scheduler_leases"
+    
+    name = Column(String(100), primary_key=True)  # 任务名称
+    owner = Column(String(200), nullable=False)  # 持有者标识（主机名:进程号:随机串）
+    expires_at = Column(DateTime, nullable=False)  # 租约过期时间
+    heartbeat_at = Column(DateTime, default=datetime.utcnow, nullable=False)  # 最近一次续约时间
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from datetime import datetime
+from app.database import Base
+
+
+class SchemaVersion(Base):
+    """数据库结构版本模型（每条记录对应一个已执行的迁移）"""
+    __tablename__ = "schema_versions"
+    
+    version = Column(Integer, primary_key=True)  # 迁移版本号
+    name = Column(String(200), nullable=False)  # 迁移名称
+    applied_at = Column(DateTime, default=datetime.utcnow, nullable=False)  # 执行时间
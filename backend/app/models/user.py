@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, DateTime, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -14,6 +14,10 @@ class UserRole(str, enum.Enum):
 class User(Base):
     """用户模型"""
     __tablename__ = "users"
+    __table_args__ = (
+        # 列表接口按更新时间的游标分页
+        Index("ix_users_updated_at_id", "updated_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String(50), unique=True, index=True, nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -7,6 +7,11 @@ from app.database import Base
 class UserInstance(Base):
     """用户-实例关联模型"""
     __tablename__ = "user_instances"
+    __table_args__ = (
+        # 同一用户对同一实例只有一条关联；也覆盖按 user_id 的查询
+        Index("ux_user_instances_user_instance", "user_id", "instance_id", unique=True),
+        Index("ix_user_instances_instance_id", "instance_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
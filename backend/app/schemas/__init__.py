@@ -1,9 +1,13 @@
 from app.schemas.auth import Token, LoginRequest, RefreshTokenRequest
 from app.schemas.user import (
     UserCreate, UserUpdate, UserResponse, UserWithInstances,
-    UserChangePassword, AssignInstancesRequest
+    UserChangePassword, AssignInstancesRequest, BulkAssignInstancesRequest,
+    BulkAssignInstancesResult, UserImportError, UserImportResult
 )
-from app.schemas.instance import InstanceCreate, InstanceUpdate, InstanceResponse
+from app.schemas.instance import InstanceCreate, InstanceUpdate, InstanceResponse, InstanceChanges
+from app.schemas.health import HealthTrendPoint, HealthTrend
+from app.schemas.audit import AuditLogResponse
+from app.schemas.dashboard import DashboardInstance, DashboardFailure, HostCapacity, DashboardSummary
 
 __all__ = [
     "Token",
@@ -15,7 +19,19 @@ __all__ = [
     "UserWithInstances",
     "UserChangePassword",
     "AssignInstancesRequest",
+    "BulkAssignInstancesRequest",
+    "BulkAssignInstancesResult",
+    "UserImportError",
+    "UserImportResult",
     "InstanceCreate",
     "InstanceUpdate",
-    "InstanceResponse"
+    "InstanceResponse",
+    "InstanceChanges",
+    "HealthTrendPoint",
+    "HealthTrend",
+    "AuditLogResponse",
+    "DashboardInstance",
+    "DashboardFailure",
+    "HostCapacity",
+    "DashboardSummary"
 ]
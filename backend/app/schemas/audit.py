@@ -0,0 +1,15 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, Optional
+from datetime import datetime
+
+
+class AuditLogResponse(BaseModel):
+    """审计日志响应模型"""
+    id: int
+    created_at: datetime
+    actor_id: Optional[int] = None
+    actor_username: Optional[str] = None
+    action: str
+    target_type: Optional[str] = None
+    target_id: Optional[int] = None
+    detail: Optional[Dict[str, Any]] = Field(None, description="操作详情")
@@ -0,0 +1,48 @@
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+from datetime import datetime
+
+
+class DashboardInstance(BaseModel):
+    """仪表盘中的实例状态"""
+    id: int
+    name: str
+    url: Optional[str] = None
+    container_name: Optional[str] = None
+    host_port: Optional[int] = None
+    container_status: Optional[str] = Field(None, description="容器实时状态（Docker 不可用时为数据库中的状态）")
+    health_status: Optional[str] = None
+    local_health_status: Optional[str] = None
+    tunnel_health_status: Optional[str] = None
+    last_health_check: Optional[datetime] = None
+    tunnel_latency_ms: Optional[int] = Field(None, description="最近一次隧道探测耗时（毫秒，仅执行健康检查的进程有值）")
+
+
+class DashboardFailure(BaseModel):
+    """实例在统计窗口内的探测失败情况"""
+    instance_id: int
+    name: Optional[str] = None
+    failures: int
+    last_failure_at: datetime
+
+
+class HostCapacity(BaseModel):
+    """宿主机容量"""
+    cpus: Optional[int] = None
+    memory_bytes: Optional[int] = None
+    containers: Optional[int] = None
+    containers_running: Optional[int] = None
+    disk_total_bytes: Optional[int] = None
+    disk_free_bytes: Optional[int] = None
+
+
+class DashboardSummary(BaseModel):
+    """管理员仪表盘汇总"""
+    generated_at: datetime
+    users: Dict[str, int] = Field(default_factory=dict, description="按角色统计的用户数")
+    health_counts: Dict[str, int] = Field(default_factory=dict, description="按健康状态统计的实例数")
+    container_counts: Dict[str, int] = Field(default_factory=dict, description="按容器状态统计的实例数")
+    recent_failures: List[DashboardFailure] = Field(default_factory=list)
+    instances: List[DashboardInstance] = Field(default_factory=list)
+    host: Optional[HostCapacity] = Field(None, description="宿主机容量（Docker 不可用时为空）")
+    docker_error: Optional[str] = None
@@ -0,0 +1,31 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List
+from datetime import datetime
+
+
+class HealthTrendPoint(BaseModel):
+    """健康趋势数据点"""
+    bucket_start: datetime
+    total: int
+    success: int
+    success_ratio: Optional[float] = None
+    p50_ms: Optional[int] = Field(None, description="响应时间 p50（仅单实例趋势）")
+    p95_ms: Optional[int] = Field(None, description="响应时间 p95（仅单实例趋势）")
+    avg_p50_ms: Optional[int] = Field(
+        None, description="各实例 p50 按成功样本数加权的平均值（仅全体趋势，近似值，不是全体分布的百分位）"
+    )
+    avg_p95_ms: Optional[int] = Field(
+        None, description="各实例 p95 按成功样本数加权的平均值（仅全体趋势，近似值，不是全体分布的百分位）"
+    )
+    instances: Optional[int] = Field(None, description="参与汇总的实例数（仅全体趋势）")
+
+
+class HealthTrend(BaseModel):
+    """健康趋势响应模型"""
+    instance_id: Optional[int] = None
+    period: str
+    since: datetime
+    total: int
+    success: int
+    success_ratio: Optional[float] = None
+    points: List[HealthTrendPoint] = Field(default_factory=list)
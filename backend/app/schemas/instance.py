@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, HttpUrl
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 
@@ -32,9 +32,20 @@ class InstanceResponse(InstanceBase):
     container_status: Optional[str] = None
     health_status: Optional[str] = None
     last_health_check: Optional[datetime] = None
+    local_health_status: Optional[str] = None
+    tunnel_health_status: Optional[str] = None
+    last_tunnel_check: Optional[datetime] = None
     created_at: datetime
     updated_at: datetime
     
     class Config:
         from_attributes = True
 
+
+
+class InstanceChanges(BaseModel):
+    """实例增量同步响应"""
+    cursor: str = Field(..., description="下次请求传入的 since 游标")
+    full: bool = Field(..., description="是否为全量结果（客户端应替换本地列表）")
+    instances: List[InstanceResponse] = Field(default_factory=list, description="新增或变化的实例")
+    deleted_ids: List[int] = Field(default_factory=list, description="已删除或已无权访问的实例ID")
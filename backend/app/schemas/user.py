@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Dict, Optional, List
 from datetime import datetime
 from app.models.user import UserRole
 
@@ -50,3 +50,33 @@ class UserWithInstances(UserResponse):
 class AssignInstancesRequest(BaseModel):
     """分配实例请求模型"""
     instance_ids: List[int] = Field(..., description="实例ID列表")
+
+
+class BulkAssignInstancesRequest(BaseModel):
+    """批量分配实例请求模型"""
+    assignments: Dict[int, List[int]] = Field(
+        ..., min_length=1, description="用户ID -> 该用户的全部实例ID列表（替换现有分配）"
+    )
+
+
+class BulkAssignInstancesResult(BaseModel):
+    """批量分配实例结果"""
+    message: str
+    users: int = Field(..., description="请求中的用户数")
+    added: int = Field(..., description="新增的关联数")
+    removed: int = Field(..., description="删除的关联数")
+    changed_user_ids: List[int] = Field(default_factory=list, description="分配发生变化的用户ID")
+
+
+class UserImportError(BaseModel):
+    """批量导入中失败的行"""
+    line: int = Field(..., description="文件中的行号")
+    username: Optional[str] = Field(None, description="用户名")
+    error: str = Field(..., description="失败原因")
+
+
+class UserImportResult(BaseModel):
+    """批量导入结果"""
+    created: int = Field(..., description="成功创建的用户数")
+    failed: int = Field(..., description="失败的行数")
+    errors: List[UserImportError] = Field(default_factory=list, description="失败行明细")
@@ -0,0 +1,122 @@
+from sqlalchemy import delete, insert, select
+from app.models import AuditLog
+from app.database import SessionLocal
+from app.config import settings
+from typing import Any, Dict, List, Optional
+from collections import deque
+from datetime import datetime, timedelta
+import json
+import threading
+
+# 每次清理删除的最大行数，避免长时间持有写锁
+_PURGE_CHUNK_SIZE = 5000
+
+
+class AuditLogWriter:
+    """
+    审计日志异步批量写入
+
+    请求中只把记录放入内存队列（不访问数据库），由后台任务定期取出，
+    每批用一条 executemany 在一个事务中写入；进程退出前应调用 flush。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: deque = deque()
+        self.dropped = 0  # 累计丢弃的条数
+        self._reported_dropped = 0  # 已输出过日志的丢弃条数
+
+    def record(self, actor, action: str, target_type: Optional[str] = None,
+               target_id: Optional[int] = None, **detail: Any):
+        """
+        记录一次操作
+
+        Args:
+            actor: 操作者（Principal，系统操作传 None）
+            action: 操作名称，如 user.create、instance.deploy
+            detail: 额外信息，需可 JSON 序列化
+        """
+        entry = {
+            "created_at": datetime.utcnow(),
+            "actor_id": actor.id if actor is not None else None,
+            "actor_username": actor.username if actor is not None else None,
+            "action": action,
+            "target_type": target_type,
+            "target_id": target_id,
+            "detail": json.dumps(detail, ensure_ascii=False, default=str) if detail else None,
+        }
+        with self._lock:
+            if len(self._pending) >= settings.AUDIT_LOG_MAX_PENDING:
+                self.dropped += 1
+                return
+            self._pending.append(entry)
+
+    def _take(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            count = min(len(self._pending), settings.AUDIT_LOG_BATCH_SIZE)
+            return [self._pending.popleft() for _ in range(count)]
+
+    def _requeue(self, entries: List[Dict[str, Any]]):
+        with self._lock:
+            self._pending.extendleft(reversed(entries))
+
+    def flush(self) -> int:
+        """将队列中的记录批量写入数据库，返回写入条数"""
+        written = 0
+        while True:
+            entries = self._take()
+            if not entries:
+                break
+            db = SessionLocal()
+            try:
+                db.execute(insert(AuditLog), entries)
+                db.commit()
+                written += len(entries)
+            except Exception as e:
+                db.rollback()
+                # 放回队列等待下次写入
+                self._requeue(entries)
+                print(f"[AuditLog] 写入失败，{len(entries)} 条记录将在下次重试: {e}")
+                break
+            finally:
+                db.close()
+        with self._lock:
+            dropped = self.dropped - self._reported_dropped
+            self._reported_dropped = self.dropped
+        if dropped:
+            print(f"[AuditLog] 队列已满，新丢弃 {dropped} 条记录（累计 {self.dropped} 条）")
+        return written
+
+    def pending(self) -> int:
+        """等待写入的条数"""
+        with self._lock:
+            return len(self._pending)
+
+    @staticmethod
+    def purge() -> int:
+        """删除超过保留期的记录（分块删除），返回删除条数"""
+        cutoff = datetime.utcnow() - timedelta(days=settings.AUDIT_LOG_RETENTION_DAYS)
+        removed = 0
+        db = SessionLocal()
+        try:
+            while True:
+                ids = db.execute(
+                    select(AuditLog.id).where(AuditLog.created_at < cutoff).limit(_PURGE_CHUNK_SIZE)
+                ).scalars().all()
+                if not ids:
+                    break
+                db.execute(delete(AuditLog).where(AuditLog.id.in_(ids)))
+                db.commit()
+                removed += len(ids)
+            if removed:
+                print(f"[AuditLog] 已清理 {removed} 条过期记录")
+        except Exception as e:
+            db.rollback()
+            print(f"[AuditLog] 清理失败: {e}")
+        finally:
+            db.close()
+        return removed
+
+
+# 进程内共享的审计日志写入器
+audit_log = AuditLogWriter()
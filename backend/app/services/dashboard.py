@@ -0,0 +1,95 @@
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.models import HealthCheckRecord, User
+from app.services.docker_service import DockerService
+from app.services.fleet_state import fleet_state
+from app.services.status_buffer import status_buffer
+from app.config import settings
+from collections import Counter
+from typing import Any, Dict, List, Optional
+from datetime import datetime, timedelta
+
+# 仪表盘展示的实例字段
+_INSTANCE_FIELDS = (
+    "id", "name", "url", "container_name", "host_port", "container_status", "health_status",
+    "local_health_status", "tunnel_health_status", "last_health_check", "tunnel_latency_ms",
+)
+
+# 数据库中有容器 ID、但 Docker 中已找不到该容器
+MISSING_CONTAINER = "missing"
+
+
+class DashboardService:
+    """管理员仪表盘汇总"""
+
+    @staticmethod
+    def _docker_snapshot() -> Dict[str, Any]:
+        """一次列出容器并读取宿主机容量；Docker 不可用时返回错误信息"""
+        try:
+            docker_service = DockerService()
+            return {
+                "containers": docker_service.list_containers(),
+                "host": docker_service.get_host_capacity(),
+                "error": None,
+            }
+        except RuntimeError as e:
+            return {"containers": None, "host": None, "error": str(e)}
+
+    @staticmethod
+    def summary(db: Session) -> Dict[str, Any]:
+        """
+        汇总实例、用户、探测失败与宿主机状态
+
+        实例状态来自进程内实例状态表，数据库只执行两条查询（按角色统计用户、按实例分组的失败次数），
+        Docker 只调用一次容器列表和一次宿主机信息，与实例数量无关。
+        容器实时状态与记录不一致时写入状态缓冲。
+        """
+        now = datetime.utcnow()
+        docker = DashboardService._docker_snapshot()
+        containers: Optional[Dict[str, Dict[str, Any]]] = docker["containers"]
+
+        instances: List[Dict[str, Any]] = []
+        names: Dict[int, str] = {}
+        for state in fleet_state.states():
+            item = {field: getattr(state, field) for field in _INSTANCE_FIELDS}
+
+            if containers is not None and state.container_id:
+                container = containers.get(state.container_id)
+                if container is None:
+                    item["container_status"] = MISSING_CONTAINER
+                elif container["status"] != item["container_status"]:
+                    item["container_status"] = container["status"]
+                    status_buffer.update(state.id, container_status=container["status"])
+
+            names[state.id] = state.name
+            instances.append(item)
+
+        users = {
+            role.value: count
+            for role, count in db.query(User.role, func.count(User.id)).group_by(User.role)
+        }
+
+        last_failure = func.max(HealthCheckRecord.checked_at)
+        failures = db.query(
+            HealthCheckRecord.instance_id, func.count(HealthCheckRecord.id), last_failure
+        ).filter(
+            HealthCheckRecord.checked_at >= now - timedelta(hours=settings.DASHBOARD_FAILURE_WINDOW_HOURS),
+            HealthCheckRecord.healthy.is_(False)
+        ).group_by(HealthCheckRecord.instance_id).order_by(last_failure.desc()).limit(
+            settings.DASHBOARD_RECENT_FAILURES
+        ).all()
+
+        return {
+            "generated_at": now,
+            "users": users,
+            "health_counts": dict(Counter(item["health_status"] or "unknown" for item in instances)),
+            "container_counts": dict(Counter(item["container_status"] or "none" for item in instances)),
+            "recent_failures": [
+                {"instance_id": instance_id, "name": names.get(instance_id), "failures": count,
+                 "last_failure_at": last_failure_at}
+                for instance_id, count, last_failure_at in failures
+            ],
+            "instances": instances,
+            "host": docker["host"],
+            "docker_error": docker["error"],
+        }
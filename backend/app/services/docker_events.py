@@ -0,0 +1,99 @@
+from app.services.docker_service import DockerService
+from app.services.fleet_state import fleet_state
+from app.services.status_buffer import status_buffer
+from app.config import settings
+from typing import Any, Callable, Optional
+import threading
+
+# Docker 容器事件对应的容器状态（与 container.status 的取值一致）
+EVENT_STATUS = {
+    "start": "running",
+    "restart": "running",
+    "unpause": "running",
+    "pause": "paused",
+    "die": "exited",
+}
+
+
+class DockerEventWatcher:
+    """
+    订阅 Docker 容器事件，把容器状态变化同步到实例状态表
+
+    每个进程都订阅事件并更新自己的内存状态；只有 should_persist 返回 True 的进程
+    （持有 docker_events 租约）经状态缓冲落库，避免多个 worker 重复写入。
+    事件流断开（Docker 不可用或重启）时按指数退避重连，重连后用一次容器列表补齐期间错过的变化。
+    """
+
+    def __init__(self, should_persist: Callable[[], bool]):
+        self._should_persist = should_persist
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stream: Any = None
+
+    def start(self):
+        """启动后台线程"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="docker-events", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止订阅：关闭事件流使阻塞的读取立即返回"""
+        self._stop.set()
+        stream = self._stream
+        if stream is not None:
+            try:
+                stream.close()
+            except Exception:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _set_status(self, container_id: str, container_status: str):
+        """更新容器对应实例的状态；与当前值相同时不写入"""
+        instance_id = fleet_state.by_container(container_id)
+        if instance_id is None:
+            return
+        current = fleet_state.get(instance_id)
+        if current is None or current["container_status"] == container_status:
+            return
+        if self._should_persist():
+            # 状态缓冲的监听器会同步更新状态表
+            status_buffer.update(instance_id, container_status=container_status)
+        else:
+            fleet_state.apply(instance_id, container_status=container_status)
+
+    def _resync(self, docker_service: DockerService):
+        """（重新）连接后按容器列表补齐断开期间的状态变化"""
+        for container_id, container in docker_service.list_containers().items():
+            self._set_status(container_id, container["status"])
+
+    def _run(self):
+        delay = 1
+        while not self._stop.is_set():
+            try:
+                docker_service = DockerService()
+                self._stream = docker_service.client.events(
+                    decode=True, filters={"type": "container", "event": list(EVENT_STATUS)}
+                )
+                self._resync(docker_service)
+                print("[DockerEvents] 已订阅容器事件")
+                delay = 1
+                for event in self._stream:
+                    if self._stop.is_set():
+                        break
+                    container_status = EVENT_STATUS.get(event.get("Action") or event.get("status"))
+                    container_id = event.get("id") or (event.get("Actor") or {}).get("ID")
+                    if container_status and container_id:
+                        self._set_status(container_id, container_status)
+            except Exception as e:
+                if self._stop.is_set():
+                    break
+                print(f"[DockerEvents] 事件流不可用，{delay} 秒后重试: {e}")
+            finally:
+                self._stream = None
+            self._stop.wait(delay)
+            delay = min(delay * 2, settings.DOCKER_EVENTS_RETRY_MAX_SECONDS)
+
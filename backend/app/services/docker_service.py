@@ -215,6 +215,56 @@ class DockerService:
         except Exception as e:
             raise RuntimeError(f"获取容器状态失败: {str(e)}")
     
+    def list_containers(self) -> Dict[str, Dict[str, Any]]:
+        """
+        一次列出本服务创建的全部容器（包括已停止的）
+        
+        使用 sparse 模式，只调用一次列表接口，不逐个查询容器详情
+        
+        Returns:
+            dict: {容器 ID: {'name': 容器名称, 'status': 容器状态}}
+        """
+        try:
+            containers = self.client.containers.list(
+                all=True, sparse=True, filters={'name': f"{settings.DOCKER_CONTAINER_PREFIX}_"}
+            )
+        except Exception as e:
+            raise RuntimeError(f"获取容器列表失败: {str(e)}")
+        return {
+            container.id: {
+                'name': (container.attrs.get('Names') or [''])[0].lstrip('/'),
+                'status': container.status
+            }
+            for container in containers
+        }
+    
+    def get_host_capacity(self) -> Dict[str, Any]:
+        """
+        获取宿主机容量信息
+        
+        Returns:
+            dict: CPU 数、内存、容器数量及配置目录所在磁盘的使用情况
+        """
+        try:
+            info = self.client.info()
+        except Exception as e:
+            raise RuntimeError(f"获取宿主机信息失败: {str(e)}")
+        capacity = {
+            'cpus': info.get('NCPU'),
+            'memory_bytes': info.get('MemTotal'),
+            'containers': info.get('Containers'),
+            'containers_running': info.get('ContainersRunning'),
+            'disk_total_bytes': None,
+            'disk_free_bytes': None
+        }
+        base_path = os.path.abspath(settings.DOCKER_BASE_PATH)
+        if os.path.exists(base_path):
+            import shutil
+            usage = shutil.disk_usage(base_path)
+            capacity['disk_total_bytes'] = usage.total
+            capacity['disk_free_bytes'] = usage.free
+        return capacity
+    
     def read_deploy_yaml(self, config_path: str) -> Dict[str, Any]:
         """
         读取 deploy.yaml 配置文件
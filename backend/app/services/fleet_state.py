@@ -0,0 +1,271 @@
+from sqlalchemy import select
+from app.models import Instance, InstanceTombstone
+from app.schemas import InstanceResponse
+from app.database import SessionLocal
+from app.config import settings
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.serialization import response_columns
+from app.services.status_buffer import status_buffer, TIMESTAMP_FIELDS
+from dataclasses import dataclass, fields
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+from datetime import datetime, timedelta
+import threading
+import zlib
+
+# 从数据库加载的列，顺序与 InstanceResponse 一致
+_COLUMNS = response_columns(Instance, InstanceResponse)
+RESPONSE_FIELDS = tuple(column.key for column in _COLUMNS)
+
+
+@dataclass(slots=True)
+class InstanceState:
+    """单个实例的内存状态（数据库字段 + 仅在内存中的探测耗时）"""
+    name: str
+    url: Optional[str]
+    description: Optional[str]
+    id: int
+    container_id: Optional[str]
+    container_name: Optional[str]
+    config_path: Optional[str]
+    host_port: Optional[int]
+    container_status: Optional[str]
+    health_status: Optional[str]
+    last_health_check: Optional[datetime]
+    local_health_status: Optional[str]
+    tunnel_health_status: Optional[str]
+    last_tunnel_check: Optional[datetime]
+    created_at: datetime
+    updated_at: datetime
+    tunnel_latency_ms: Optional[int] = None  # 本进程最近一次隧道探测耗时（毫秒）
+
+    def to_dict(self) -> Dict[str, Any]:
+        """与 InstanceResponse 字段一致的字典"""
+        return {name: getattr(self, name) for name in RESPONSE_FIELDS}
+
+
+_STATE_FIELDS = frozenset(field.name for field in fields(InstanceState))
+
+
+def _digest(state: InstanceState) -> int:
+    """单个实例版本的摘要（与进程无关，多个 worker 对同一数据得到相同的值）"""
+    return zlib.crc32(f"{state.id}|{state.updated_at.isoformat()}".encode())
+
+
+class FleetStateStore:
+    """
+    进程内的实例状态表
+
+    启动时从数据库全量加载，之后由以下来源更新，读接口直接从内存返回：
+    - 管理接口写入数据库后调用 put / remove；
+    - 状态缓冲的每次写入（健康检查、容器操作、Docker 事件）经监听器同步到这里；
+    - 后台任务按 updated_at 与删除记录增量同步其他 worker 写入的数据。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._states: Dict[int, InstanceState] = {}
+        self._by_container: Dict[str, int] = {}
+        self._checksum = 0  # 全部实例摘要的异或，增删改时增量维护
+        self._synced_at: Optional[datetime] = None
+        status_buffer.add_listener(self.apply)
+
+    # ==================== 写入 ====================
+
+    def _discard_locked(self, instance_id: int) -> Optional[InstanceState]:
+        state = self._states.pop(instance_id, None)
+        if state is not None:
+            self._checksum ^= _digest(state)
+            if state.container_id:
+                self._by_container.pop(state.container_id, None)
+        return state
+
+    def _put_locked(self, values: Dict[str, Any]):
+        old = self._discard_locked(values["id"])
+        latency = old.tunnel_latency_ms if old is not None else None
+        state = InstanceState(**values, tunnel_latency_ms=latency)
+        self._states[state.id] = state
+        self._checksum ^= _digest(state)
+        if state.container_id:
+            self._by_container[state.container_id] = state.id
+
+    def put(self, row):
+        """写入一行数据库数据（ORM 对象或查询行），未落库的缓冲状态优先"""
+        values = {name: getattr(row, name) for name in RESPONSE_FIELDS}
+        values.update(status_buffer.pending(values["id"]))
+        with self._lock:
+            self._put_locked(values)
+
+    def remove(self, instance_id: int):
+        """移除已删除的实例"""
+        with self._lock:
+            self._discard_locked(instance_id)
+
+    def apply(self, instance_id: int, **changes):
+        """
+        更新实例的部分字段（状态缓冲监听器）
+
+        只有时间戳变化时不推进 updated_at，与数据库按时间粒度合并写入的行为一致。
+        """
+        with self._lock:
+            state = self._states.get(instance_id)
+            if state is None:
+                return
+            changed = False
+            for name, value in changes.items():
+                if name in _STATE_FIELDS and getattr(state, name) != value:
+                    setattr(state, name, value)
+                    changed = changed or name not in TIMESTAMP_FIELDS
+            if changed:
+                self._checksum ^= _digest(state)
+                state.updated_at = datetime.utcnow()
+                self._checksum ^= _digest(state)
+
+    def record_latency(self, instance_id: int, latency_ms: Optional[int]):
+        """记录隧道探测耗时（只保存在内存中）"""
+        with self._lock:
+            state = self._states.get(instance_id)
+            if state is not None:
+                state.tunnel_latency_ms = latency_ms
+
+    # ==================== 与数据库同步 ====================
+
+    def load(self):
+        """从数据库全量加载"""
+        with self._sync_lock:
+            now = datetime.utcnow()
+            db = SessionLocal()
+            try:
+                rows = db.query(*_COLUMNS).order_by(Instance.id).all()
+            finally:
+                db.close()
+            with self._lock:
+                self._states.clear()
+                self._by_container.clear()
+                self._checksum = 0
+            for row in rows:
+                self.put(row)
+            self._synced_at = now
+
+    def sync(self) -> int:
+        """
+        增量同步其他 worker 写入数据库的变化，返回更新的实例数
+
+        只查询 updated_at 晚于上次同步时间的实例和之后的删除记录（均走索引），
+        开销与变化量成正比。
+        """
+        if self._synced_at is None:
+            self.load()
+            return len(self._states)
+
+        with self._sync_lock:
+            now = datetime.utcnow()
+            after = self._synced_at - timedelta(seconds=settings.INSTANCE_SYNC_OVERLAP_SECONDS)
+            db = SessionLocal()
+            try:
+                rows = db.query(*_COLUMNS).filter(Instance.updated_at > after).all()
+                deleted = db.execute(
+                    select(InstanceTombstone.instance_id).where(InstanceTombstone.deleted_at > after)
+                ).scalars().all()
+            finally:
+                db.close()
+
+            current = {row.id for row in rows}
+            for instance_id in set(deleted) - current:
+                self.remove(instance_id)
+            for row in rows:
+                self.put(row)
+            self._synced_at = now
+            return len(rows)
+
+    def _ensure_loaded(self):
+        if self._synced_at is None:
+            self.load()
+
+    # ==================== 读取 ====================
+
+    def get(self, instance_id: int) -> Optional[Dict[str, Any]]:
+        """单个实例（InstanceResponse 字段），不存在时返回 None"""
+        self._ensure_loaded()
+        with self._lock:
+            state = self._states.get(instance_id)
+            return state.to_dict() if state is not None else None
+
+    def by_container(self, container_id: str) -> Optional[int]:
+        """按容器 ID 查找实例 ID"""
+        with self._lock:
+            return self._by_container.get(container_id)
+
+    def states(self, instance_ids: Optional[Iterable[int]] = None) -> List[InstanceState]:
+        """按 ID 排序的状态记录副本；instance_ids 为 None 时返回全部"""
+        self._ensure_loaded()
+        with self._lock:
+            if instance_ids is None:
+                selected = list(self._states.values())
+            else:
+                selected = [self._states[i] for i in instance_ids if i in self._states]
+        selected.sort(key=lambda state: state.id)
+        return selected
+
+    def instances(self, instance_ids: Optional[Iterable[int]] = None) -> List[Dict[str, Any]]:
+        """按 ID 排序的实例列表（InstanceResponse 字段）"""
+        return [state.to_dict() for state in self.states(instance_ids)]
+
+    def version(self, instance_ids: Optional[FrozenSet[int]] = None) -> str:
+        """
+        数据版本（实例数与各实例 (id, updated_at) 摘要的异或），用于 ETag
+
+        任一实例新增、删除或 updated_at 变化都会改变版本；不依赖最大 updated_at，
+        其他 worker 写入的较早时间戳同步过来时同样能反映出来。
+        """
+        self._ensure_loaded()
+        with self._lock:
+            if instance_ids is None:
+                count, checksum = len(self._states), self._checksum
+            else:
+                count, checksum = 0, 0
+                for instance_id in instance_ids:
+                    state = self._states.get(instance_id)
+                    if state is not None:
+                        count += 1
+                        checksum ^= _digest(state)
+        return f"{count}:{checksum:08x}"
+
+    def page(self, sort: str, cursor: Optional[str], limit: int,
+             health_status: Optional[str] = None, container_status: Optional[str] = None,
+             name_prefix: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        在内存中筛选、排序并按 (排序键, id) 游标分页，游标格式与数据库分页一致
+
+        Returns:
+            (当前页的实例, 下一页游标；没有更多数据时为 None)
+        """
+        self._ensure_loaded()
+        descending = sort.startswith("-")
+        field = sort.lstrip("-")
+        with self._lock:
+            selected = [
+                state for state in self._states.values()
+                if (health_status is None or state.health_status == health_status)
+                and (container_status is None or state.container_status == container_status)
+                and (name_prefix is None or state.name.startswith(name_prefix))
+            ]
+
+        def key(state: InstanceState):
+            return (getattr(state, field), state.id)
+
+        if cursor:
+            value, last_id = decode_cursor(cursor, sort)
+            after = (last_id, last_id) if field == "id" else (value, last_id)
+            selected = [s for s in selected if (key(s) < after if descending else key(s) > after)]
+
+        selected.sort(key=key, reverse=descending)
+        if len(selected) <= limit:
+            return [state.to_dict() for state in selected], None
+        selected = selected[:limit]
+        last = selected[-1]
+        return [state.to_dict() for state in selected], encode_cursor(sort, getattr(last, field), last.id)
+
+
+# 进程内共享的实例状态表
+fleet_state = FleetStateStore()
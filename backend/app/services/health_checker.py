@@ -1,77 +1,280 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import or_, select
 from app.models import Instance
-from app.database import SessionLocal
+from app.database import AsyncSessionLocal
+from app.config import settings
+from app.services.health_history import HealthHistoryService
+from app.services.status_buffer import status_buffer
+from app.services.fleet_state import fleet_state
+from typing import Optional, List, Dict, Any
 import httpx
 import logging
 import asyncio
+import errno
+import socket
+import time
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# ALAS Web UI 在容器内监听的端口
+ALAS_WEB_PORT = 22267
+
+# 本地探测地址无法到达（域名解析失败、无路由），无法据此判断容器状态
+LOCAL_UNREACHABLE = "unreachable"
+
+# 表示地址本身不可达（而不是地址上的服务没有响应）的错误码
+_ADDRESS_ERRNOS = {errno.EHOSTUNREACH, errno.ENETUNREACH, errno.EADDRNOTAVAIL}
+
+# 地址可达时，这些错误说明容器内的 Web UI 没有正常提供服务
+_SERVICE_ERRORS = (httpx.ConnectError, httpx.ReadError, httpx.TimeoutException, httpx.RemoteProtocolError)
+
+
+def _is_address_failure(exc: BaseException) -> bool:
+    """沿异常链判断是否为域名解析失败或无路由"""
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        if isinstance(exc, socket.gaierror):
+            return True
+        if isinstance(exc, OSError) and exc.errno in _ADDRESS_ERRNOS:
+            return True
+        exc = exc.__cause__ or exc.__context__
+    return False
+
+
 class HealthCheckService:
+    # 由应用生命周期持有的长连接探测客户端
+    _client: Optional[httpx.AsyncClient] = None
+
+    @staticmethod
+    def _build_client() -> httpx.AsyncClient:
+        """Create a keep-alive probe client with bounded connection pool"""
+        limits = httpx.Limits(
+            max_connections=settings.HEALTH_CHECK_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HEALTH_CHECK_MAX_KEEPALIVE,
+            keepalive_expiry=settings.HEALTH_CHECK_KEEPALIVE_EXPIRY,
+        )
+
+        http2 = settings.HEALTH_CHECK_HTTP2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                print("[HealthCheck] 未安装 h2，HTTP/2 已禁用")
+                http2 = False
+
+        return httpx.AsyncClient(
+            verify=False,
+            http2=http2,
+            limits=limits,
+            timeout=settings.HEALTH_CHECK_TIMEOUT,
+        )
+
+    @classmethod
+    async def start_client(cls):
+        """Open the shared probe client (called from app lifespan)"""
+        if cls._client is None:
+            cls._client = cls._build_client()
+
+    @classmethod
+    async def close_client(cls):
+        """Close the shared probe client (called from app lifespan)"""
+        if cls._client is not None:
+            await cls._client.aclose()
+            cls._client = None
+
+    @staticmethod
+    async def _probe(url: str, client: httpx.AsyncClient, timeout: float) -> str:
+        """Probe a single URL, HEAD first then GET"""
+        # First try HEAD request
+        response = await client.head(url, timeout=timeout)
+        if response.status_code < 400:
+            return "healthy"
+
+        # If HEAD fails (some servers block it), try GET
+        response = await client.get(url, timeout=timeout)
+        if response.status_code < 400:
+            return "healthy"
+        else:
+            return "unhealthy"
+
+    @staticmethod
+    def local_url(instance: Instance) -> Optional[str]:
+        """Address of the container's web UI on the local network, bypassing the tunnel"""
+        mode = settings.HEALTH_CHECK_LOCAL_MODE
+        if mode == "host" and instance.host_port:
+            return f"http://{settings.HEALTH_CHECK_LOCAL_HOST}:{instance.host_port}/"
+        if mode == "container" and instance.container_name:
+            return f"http://{instance.container_name}:{ALAS_WEB_PORT}/"
+        return None
+
     @staticmethod
     async def check_instance_health(instance: Instance, client: httpx.AsyncClient):
-        """Check health for a single instance"""
+        """Check health for a single instance through its public URL"""
         if not instance.url:
             return None
-        
+
         try:
-            # First try HEAD request
-            response = await client.head(instance.url, timeout=5.0)
-            if response.status_code < 400:
-                return "healthy"
-            
-            # If HEAD fails (some servers block it), try GET
-            response = await client.get(instance.url, timeout=5.0)
-            if response.status_code < 400:
-                return "healthy"
-            else:
-                return "unhealthy"
+            return await HealthCheckService._probe(instance.url, client, settings.HEALTH_CHECK_TIMEOUT)
         except Exception as e:
             print(f"[HealthCheck] 检查失败 {instance.name}: {e}")
             return "unhealthy"
 
     @staticmethod
-    async def check_all_instances():
+    async def check_local_health(instance: Instance, client: httpx.AsyncClient):
+        """
+        Check health for a single instance through the local container network
+
+        An HTTP error response is "unhealthy". Connection refused, read errors and
+        timeouts are also "unhealthy" once the container is known to be running or
+        the address has answered before (a stopped or crashed web UI). DNS and
+        routing failures, or connection errors from an address that has never
+        answered, return LOCAL_UNREACHABLE: the probe address is likely not
+        reachable from where the backend runs, and the caller falls back to the
+        tunnel probe.
+        """
+        url = HealthCheckService.local_url(instance)
+        if not url:
+            return None
+
+        try:
+            return await HealthCheckService._probe(url, client, settings.HEALTH_CHECK_LOCAL_TIMEOUT)
+        except Exception as e:
+            container_status = status_buffer.get(instance.id, "container_status", instance.container_status)
+            last_local_status = status_buffer.get(instance.id, "local_health_status", instance.local_health_status)
+            known_reachable = container_status == "running" or last_local_status in ("healthy", "unhealthy")
+            if isinstance(e, _SERVICE_ERRORS) and known_reachable and not _is_address_failure(e):
+                print(f"[HealthCheck] 本地检查失败 {instance.name}: {e!r}")
+                return "unhealthy"
+            print(f"[HealthCheck] 本地检查地址不可达 {instance.name}: {e!r}")
+            return LOCAL_UNREACHABLE
+
+    @classmethod
+    async def check_all_instances(cls):
         """Check health for all instances"""
         print("[HealthCheck] 开始执行健康检查...")
         try:
-            db = SessionLocal()
-            instances = db.query(Instance).filter(Instance.url.isnot(None)).all()
-            
-            print(f"[HealthCheck] 找到 {len(instances)} 个有URL的实例")
-            
+            # 读取后立即结束事务并归还连接，探测期间不占用连接池和 WAL 快照
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(Instance).where(
+                        or_(Instance.url.isnot(None), Instance.host_port.isnot(None), Instance.container_name.isnot(None))
+                    )
+                )
+                instances = result.scalars().all()
+
+            print(f"[HealthCheck] 找到 {len(instances)} 个可检查的实例")
+
             if not instances:
-                db.close()
                 print("[HealthCheck] 没有需要检查的实例")
                 return
 
-            # Use asynchronous context manager for httpx client
-            async with httpx.AsyncClient(verify=False) as client:
-                tasks = []
-                for instance in instances:
-                    # We wrap the check and update in a task
-                    tasks.append(HealthCheckService._check_and_update(instance, client, db))
-                
-                # Run all checks concurrently
-                if tasks:
-                    await asyncio.gather(*tasks)
-            
-            db.commit()
-            db.close()
+            # 登记数据库中的当前状态，未变化的结果不会再写入
+            for instance in instances:
+                status_buffer.observe(
+                    instance.id,
+                    health_status=instance.health_status,
+                    last_health_check=instance.last_health_check,
+                    local_health_status=instance.local_health_status,
+                    tunnel_health_status=instance.tunnel_health_status,
+                    last_tunnel_check=instance.last_tunnel_check,
+                )
+
+            # Reuse the lifespan-owned client; fall back to a temporary one
+            # when called outside the app (e.g. scripts)
+            client = cls._client
+            owns_client = client is None
+            if owns_client:
+                client = cls._build_client()
+
+            # Bound the fan-out so large fleets don't open N sockets at once
+            semaphore = asyncio.Semaphore(max(1, settings.HEALTH_CHECK_CONCURRENCY))
+            results: List[Dict[str, Any]] = []
+
+            async def bounded(instance: Instance):
+                async with semaphore:
+                    await cls._check_and_update(instance, client, results)
+
+            try:
+                await asyncio.gather(*(bounded(instance) for instance in instances))
+            finally:
+                if owns_client:
+                    await client.aclose()
+
+            # 记录本轮探测结果，供历史趋势查询；实例状态经写缓冲批量落库
+            if results:
+                async with AsyncSessionLocal() as db:
+                    await db.run_sync(HealthHistoryService.record_results, results)
+                    await db.commit()
             print("[HealthCheck] 健康检查完成")
         except Exception as e:
             print(f"[HealthCheck] 发生错误: {e}")
             import traceback
             traceback.print_exc()
-            if 'db' in locals():
-                db.close()
 
     @staticmethod
-    async def _check_and_update(instance: Instance, client: httpx.AsyncClient, db: Session):
-        """Helper to check and update a single instance in the same session"""
-        status = await HealthCheckService.check_instance_health(instance, client)
-        if status:
-            instance.health_status = status
-            instance.last_health_check = datetime.utcnow()
-            print(f"[HealthCheck] {instance.name}: {status}")
+    def _tunnel_due(instance: Instance, now: datetime) -> bool:
+        """Whether the slower public-URL probe should run this cycle"""
+        last_tunnel_check = status_buffer.get(instance.id, "last_tunnel_check")
+        if last_tunnel_check is None:
+            return True
+        elapsed = (now - last_tunnel_check).total_seconds()
+        return elapsed >= settings.HEALTH_CHECK_TUNNEL_INTERVAL_SECONDS
+
+    @staticmethod
+    async def _check_and_update(instance: Instance, client: httpx.AsyncClient,
+                                results: List[Dict[str, Any]]):
+        """Helper to check a single instance and buffer its status update"""
+        changes: Dict[str, Any] = {}
+
+        # 第一级：本地容器网络探测，每轮执行
+        local_status = await HealthCheckService.check_local_health(instance, client)
+        if local_status:
+            changes["local_health_status"] = local_status
+
+        # 第二级：公网隧道探测，本地探测不可用（未开启或连接失败）时每轮执行，否则按较低频率执行；
+        # 容器 Web UI 返回错误时公网必然同样失败，不发外网请求，按同样频率直接记一次失败
+        tunnel_status = None
+        now = datetime.utcnow()
+        local_usable = local_status in ("healthy", "unhealthy")
+        if instance.url and local_status == "unhealthy" and HealthCheckService._tunnel_due(instance, now):
+            tunnel_status = "unhealthy"
+            changes["tunnel_health_status"] = tunnel_status
+            changes["last_tunnel_check"] = now
+            results.append({"instance_id": instance.id, "checked_at": now, "healthy": False, "latency_ms": None})
+            fleet_state.record_latency(instance.id, None)
+        elif instance.url and local_status != "unhealthy" and (
+            not local_usable or HealthCheckService._tunnel_due(instance, now)
+        ):
+            started = time.perf_counter()
+            tunnel_status = await HealthCheckService.check_instance_health(instance, client)
+            latency_ms = int((time.perf_counter() - started) * 1000)
+            checked_at = datetime.utcnow()
+            changes["tunnel_health_status"] = tunnel_status
+            changes["last_tunnel_check"] = checked_at
+            results.append({
+                "instance_id": instance.id,
+                "checked_at": checked_at,
+                "healthy": tunnel_status == "healthy",
+                "latency_ms": latency_ms if tunnel_status == "healthy" else None,
+            })
+            fleet_state.record_latency(instance.id, latency_ms if tunnel_status == "healthy" else None)
+
+        if not local_status and not tunnel_status:
+            return
+
+        # 综合状态：容器不可用即异常，否则以最近一次隧道结果为准；都无法判断时为 unknown
+        last_tunnel_status = tunnel_status or status_buffer.get(instance.id, "tunnel_health_status")
+        if local_status == "unhealthy":
+            status = "unhealthy"
+        elif instance.url and last_tunnel_status in ("healthy", "unhealthy"):
+            status = last_tunnel_status
+        elif local_status == "healthy":
+            status = "healthy"
+        else:
+            status = "unknown"
+
+        changes["health_status"] = status
+        changes["last_health_check"] = datetime.utcnow()
+        status_buffer.update(instance.id, **changes)
+        print(f"[HealthCheck] {instance.name}: {status} (容器: {local_status or '-'}, 隧道: {tunnel_status or '-'})")
@@ -0,0 +1,253 @@
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+from app.models import HealthCheckRecord, HealthCheckRollup
+from app.database import SessionLocal
+from app.config import settings
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+from datetime import datetime, timedelta
+from itertools import groupby
+import math
+
+# 支持的汇总周期
+PERIODS = ("hour", "day")
+
+# 批量写入汇总记录时每批的行数
+_ROLLUP_BATCH_SIZE = 1000
+
+
+def _floor(dt: datetime, period: str) -> datetime:
+    """将时间向下取整到周期起点"""
+    if period == "hour":
+        return dt.replace(minute=0, second=0, microsecond=0)
+    return dt.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _step(period: str) -> timedelta:
+    """周期长度"""
+    return timedelta(hours=1) if period == "hour" else timedelta(days=1)
+
+
+def _percentile(sorted_values: List[int], pct: float) -> Optional[int]:
+    """最近秩法计算百分位（输入需已排序）"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def _summarize(rows: Iterable[Tuple[bool, Optional[int]]]) -> Dict[str, Any]:
+    """汇总一组 (healthy, latency_ms) 记录"""
+    total = 0
+    success = 0
+    latencies = []
+    for healthy, latency_ms in rows:
+        total += 1
+        if healthy:
+            success += 1
+            if latency_ms is not None:
+                latencies.append(latency_ms)
+    latencies.sort()
+    return {
+        "total": total,
+        "success": success,
+        "p50_ms": _percentile(latencies, 50),
+        "p95_ms": _percentile(latencies, 95),
+    }
+
+
+def _point(bucket_start: datetime, total: int, success: int,
+           p50_ms: Optional[int], p95_ms: Optional[int]) -> Dict[str, Any]:
+    """构造趋势数据点"""
+    return {
+        "bucket_start": bucket_start,
+        "total": total,
+        "success": success,
+        "success_ratio": round(success / total, 4) if total else None,
+        "p50_ms": p50_ms,
+        "p95_ms": p95_ms,
+    }
+
+
+class HealthHistoryService:
+    """健康检查历史：原始记录、按小时/天汇总与保留策略"""
+
+    @staticmethod
+    def record_results(db: Session, results: List[Dict[str, Any]]):
+        """
+        批量写入一轮探测结果（不提交，由调用方统一提交）
+
+        Args:
+            results: [{"instance_id", "checked_at", "healthy", "latency_ms"}, ...]
+        """
+        if results:
+            db.execute(insert(HealthCheckRecord), results)
+
+    @staticmethod
+    def _rollup(db: Session, period: str, now: datetime) -> int:
+        """
+        将已结束周期内的原始记录汇总为 period 级别的汇总记录
+
+        一轮健康检查结束时才提交本轮记录，checked_at 早于提交时间；周期结束后再等待
+        HEALTH_HISTORY_ROLLUP_GRACE_SECONDS 才汇总，避免汇总后才落库的记录被永久跳过。
+        """
+        end = _floor(now - timedelta(seconds=settings.HEALTH_HISTORY_ROLLUP_GRACE_SECONDS), period)
+        last = db.query(func.max(HealthCheckRollup.bucket_start)).filter(
+            HealthCheckRollup.period == period
+        ).scalar()
+
+        query = db.query(
+            HealthCheckRecord.instance_id,
+            HealthCheckRecord.checked_at,
+            HealthCheckRecord.healthy,
+            HealthCheckRecord.latency_ms
+        ).filter(HealthCheckRecord.checked_at < end)
+        if last is not None:
+            query = query.filter(HealthCheckRecord.checked_at >= last + _step(period))
+
+        # 按实例、时间顺序流式读取，内存中只保留一个桶的数据
+        rows = query.order_by(
+            HealthCheckRecord.instance_id, HealthCheckRecord.checked_at
+        ).yield_per(5000)
+
+        batch = []
+        written = 0
+        for (instance_id, bucket_start), group in groupby(
+            rows, key=lambda r: (r.instance_id, _floor(r.checked_at, period))
+        ):
+            summary = _summarize((r.healthy, r.latency_ms) for r in group)
+            batch.append({
+                "instance_id": instance_id,
+                "period": period,
+                "bucket_start": bucket_start,
+                **summary
+            })
+            if len(batch) >= _ROLLUP_BATCH_SIZE:
+                db.execute(insert(HealthCheckRollup), batch)
+                written += len(batch)
+                batch = []
+
+        if batch:
+            db.execute(insert(HealthCheckRollup), batch)
+            written += len(batch)
+        return written
+
+    @staticmethod
+    def compact():
+        """后台任务：生成小时/天汇总，并按保留策略清理过期数据"""
+        db = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            written = {period: HealthHistoryService._rollup(db, period, now) for period in PERIODS}
+
+            # 原始记录至少保留到所在天被汇总之后：一天结束后还要等待汇总宽限期，
+            # 且最多再晚一个压缩间隔才执行汇总
+            raw_retention = max(
+                timedelta(hours=settings.HEALTH_HISTORY_RAW_RETENTION_HOURS),
+                timedelta(hours=24)
+                + timedelta(seconds=settings.HEALTH_HISTORY_ROLLUP_GRACE_SECONDS)
+                + timedelta(minutes=settings.HEALTH_HISTORY_COMPACT_INTERVAL_MINUTES)
+            )
+            removed = db.query(HealthCheckRecord).filter(
+                HealthCheckRecord.checked_at < now - raw_retention
+            ).delete(synchronize_session=False)
+
+            for period, days in (
+                ("hour", settings.HEALTH_HISTORY_HOURLY_RETENTION_DAYS),
+                ("day", settings.HEALTH_HISTORY_DAILY_RETENTION_DAYS),
+            ):
+                removed += db.query(HealthCheckRollup).filter(
+                    HealthCheckRollup.period == period,
+                    HealthCheckRollup.bucket_start < now - timedelta(days=days)
+                ).delete(synchronize_session=False)
+
+            db.commit()
+            print(f"[HealthHistory] 压缩完成: 小时汇总 {written['hour']} 条, 天汇总 {written['day']} 条, 清理 {removed} 条")
+        except Exception as e:
+            db.rollback()
+            print(f"[HealthHistory] 压缩失败: {e}")
+        finally:
+            db.close()
+
+    @staticmethod
+    def get_instance_trend(db: Session, instance_id: int, period: str, since: datetime) -> Dict[str, Any]:
+        """
+        获取单个实例的健康趋势
+
+        已汇总的周期直接读取汇总表，尚未汇总的周期（包括当前周期）从原始记录实时计算
+        """
+        rollups = db.query(HealthCheckRollup).filter(
+            HealthCheckRollup.instance_id == instance_id,
+            HealthCheckRollup.period == period,
+            HealthCheckRollup.bucket_start >= _floor(since, period)
+        ).order_by(HealthCheckRollup.bucket_start).all()
+
+        points = [
+            _point(r.bucket_start, r.total, r.success, r.p50_ms, r.p95_ms)
+            for r in rollups
+        ]
+
+        live_start = rollups[-1].bucket_start + _step(period) if rollups else since
+        raw = db.query(
+            HealthCheckRecord.checked_at,
+            HealthCheckRecord.healthy,
+            HealthCheckRecord.latency_ms
+        ).filter(
+            HealthCheckRecord.instance_id == instance_id,
+            HealthCheckRecord.checked_at >= live_start
+        ).order_by(HealthCheckRecord.checked_at).all()
+
+        for bucket_start, group in groupby(raw, key=lambda r: _floor(r.checked_at, period)):
+            summary = _summarize((r.healthy, r.latency_ms) for r in group)
+            points.append(_point(bucket_start, **summary))
+
+        total = sum(p["total"] for p in points)
+        success = sum(p["success"] for p in points)
+        return {
+            "instance_id": instance_id,
+            "period": period,
+            "since": since,
+            "total": total,
+            "success": success,
+            "success_ratio": round(success / total, 4) if total else None,
+            "points": points,
+        }
+
+    @staticmethod
+    def get_fleet_trend(db: Session, period: str, since: datetime) -> Dict[str, Any]:
+        """
+        获取全体实例的健康趋势（基于已完成的汇总周期）
+
+        成功率为精确值。汇总表只保存各实例的百分位，无法还原全体的响应时间分布，
+        因此不返回 p50/p95，而是返回各实例百分位按成功样本数加权的平均值（avg_p50_ms / avg_p95_ms）
+        """
+        rows = db.query(
+            HealthCheckRollup.bucket_start,
+            func.sum(HealthCheckRollup.total),
+            func.sum(HealthCheckRollup.success),
+            func.sum(HealthCheckRollup.p50_ms * HealthCheckRollup.success),
+            func.sum(HealthCheckRollup.p95_ms * HealthCheckRollup.success),
+            func.sum(HealthCheckRollup.success).filter(HealthCheckRollup.p50_ms.isnot(None)),
+            func.count(HealthCheckRollup.instance_id)
+        ).filter(
+            HealthCheckRollup.period == period,
+            HealthCheckRollup.bucket_start >= _floor(since, period)
+        ).group_by(HealthCheckRollup.bucket_start).order_by(HealthCheckRollup.bucket_start).all()
+
+        points = []
+        for bucket_start, total, success, p50_sum, p95_sum, weight, instances in rows:
+            point = _point(bucket_start, total or 0, success or 0, None, None)
+            point["avg_p50_ms"] = int(p50_sum / weight) if weight else None
+            point["avg_p95_ms"] = int(p95_sum / weight) if weight else None
+            point["instances"] = instances
+            points.append(point)
+
+        total = sum(p["total"] for p in points)
+        success = sum(p["success"] for p in points)
+        return {
+            "period": period,
+            "since": since,
+            "total": total,
+            "success": success,
+            "success_ratio": round(success / total, 4) if total else None,
+            "points": points,
+        }
@@ -0,0 +1,120 @@
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+from app.models import Instance, InstanceTombstone
+from app.database import SessionLocal
+from app.config import settings
+from typing import Any, Dict, FrozenSet, Optional, Tuple
+from datetime import datetime, timedelta
+import base64
+import hashlib
+import json
+
+# 每次清理删除的最大行数，避免长时间持有写锁
+_PURGE_CHUNK_SIZE = 5000
+
+
+def _access_key(instance_ids: Optional[FrozenSet[int]]) -> Optional[str]:
+    """可访问实例集合的摘要（管理员为 None），集合变化时客户端需要全量同步"""
+    if instance_ids is None:
+        return None
+    raw = ",".join(str(i) for i in sorted(instance_ids))
+    return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+
+def encode_sync_cursor(at: datetime, access_key: Optional[str]) -> str:
+    raw = json.dumps([at.isoformat(), access_key], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_sync_cursor(cursor: str) -> Optional[Tuple[datetime, Optional[str]]]:
+    """解析同步游标，格式错误时返回 None（按全量同步处理）"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        at, access_key = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(at), access_key
+    except (ValueError, TypeError):
+        return None
+
+
+class InstanceSyncService:
+    """
+    实例列表增量同步
+
+    游标记录上次同步的服务器时间；增量请求只返回 updated_at 晚于游标的实例
+    （状态缓冲落库时会更新 updated_at）以及之后删除的实例 ID，
+    开销与变化量成正比，与实例总数无关。
+    """
+
+    @staticmethod
+    def record_deletion(db: Session, instance_id: int):
+        """记录实例删除（与删除操作在同一事务中提交）"""
+        db.add(InstanceTombstone(instance_id=instance_id, deleted_at=datetime.utcnow()))
+
+    @staticmethod
+    def changes(db: Session, since: Optional[str],
+                instance_ids: Optional[FrozenSet[int]] = None) -> Dict[str, Any]:
+        """
+        返回自游标以来的实例变化
+
+        Args:
+            since: 上次响应中的游标，不传或游标失效时返回全量结果
+            instance_ids: 普通用户可访问的实例ID；管理员传 None 表示全部实例
+
+        Returns:
+            {"cursor", "full", "instances", "deleted_ids"}
+        """
+        # 先记录时间再查询，查询期间提交的修改会在下次同步中返回
+        now = datetime.utcnow()
+        access_key = _access_key(instance_ids)
+        cursor = encode_sync_cursor(now, access_key)
+
+        query = db.query(Instance)
+        if instance_ids is not None:
+            query = query.filter(Instance.id.in_(instance_ids))
+
+        decoded = decode_sync_cursor(since) if since else None
+        retention = timedelta(hours=settings.INSTANCE_SYNC_TOMBSTONE_RETENTION_HOURS)
+        if (
+            decoded is None
+            or decoded[1] != access_key  # 实例分配已变化
+            or decoded[0] < now - retention  # 删除记录可能已被清理
+        ):
+            return {"cursor": cursor, "full": True, "instances": query.order_by(Instance.id).all(), "deleted_ids": []}
+
+        # 向前重叠一小段时间，覆盖上次查询时尚未提交、但 updated_at 更早的写入（客户端按 ID 覆盖，重复无害）
+        after = decoded[0] - timedelta(seconds=settings.INSTANCE_SYNC_OVERLAP_SECONDS)
+        instances = query.filter(Instance.updated_at > after).order_by(Instance.id).all()
+
+        deleted = db.execute(
+            select(InstanceTombstone.instance_id).where(InstanceTombstone.deleted_at > after)
+        ).scalars().all()
+        # ID 被新实例复用时以当前实例为准；普通用户只返回其可访问范围内的删除
+        current = {instance.id for instance in instances}
+        deleted_ids = sorted(
+            instance_id for instance_id in set(deleted)
+            if instance_id not in current and (instance_ids is None or instance_id in instance_ids)
+        )
+        return {"cursor": cursor, "full": False, "instances": instances, "deleted_ids": deleted_ids}
+
+    @staticmethod
+    def purge() -> int:
+        """删除超过保留期的删除记录（分块删除），返回删除条数"""
+        cutoff = datetime.utcnow() - timedelta(hours=settings.INSTANCE_SYNC_TOMBSTONE_RETENTION_HOURS)
+        removed = 0
+        db = SessionLocal()
+        try:
+            while True:
+                ids = db.execute(
+                    select(InstanceTombstone.id).where(InstanceTombstone.deleted_at < cutoff).limit(_PURGE_CHUNK_SIZE)
+                ).scalars().all()
+                if not ids:
+                    break
+                db.execute(delete(InstanceTombstone).where(InstanceTombstone.id.in_(ids)))
+                db.commit()
+                removed += len(ids)
+        except Exception as e:
+            db.rollback()
+            print(f"[InstanceSync] 清理删除记录失败: {e}")
+        finally:
+            db.close()
+        return removed
@@ -0,0 +1,113 @@
+from sqlalchemy import update, insert, or_
+from sqlalchemy.exc import IntegrityError
+from app.models import SchedulerLease
+from app.database import SessionLocal
+from app.config import settings
+from typing import Callable, Dict, Iterable
+from datetime import datetime, timedelta
+import asyncio
+import functools
+import os
+import socket
+import uuid
+
+
+class LeaderElection:
+    """
+    基于数据库租约的后台任务选主
+
+    每个进程周期性地续约/抢占各任务的租约，只有持有租约的进程才会真正执行该任务；
+    持有者宕机后租约过期，其他进程在下一次心跳时接管。
+    """
+
+    def __init__(self, names: Iterable[str]):
+        self.names = list(names)
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        # 本进程持有的租约及其过期时间，执行任务前只做内存判断
+        self._held: Dict[str, datetime] = {}
+
+    def _acquire(self, db, name: str, now: datetime) -> bool:
+        """续约或抢占单个租约，成功返回 True"""
+        expires_at = now + timedelta(seconds=settings.LEADER_LEASE_TTL_SECONDS)
+
+        # 自己持有或已过期时原子地接管
+        result = db.execute(
+            update(SchedulerLease)
+            .where(
+                SchedulerLease.name == name,
+                or_(SchedulerLease.owner == self.owner, SchedulerLease.expires_at < now)
+            )
+            .values(owner=self.owner, expires_at=expires_at, heartbeat_at=now)
+        )
+        if result.rowcount == 0:
+            # 租约不存在时尝试创建；已被其他进程持有则插入失败
+            try:
+                db.execute(insert(SchedulerLease).values(
+                    name=name, owner=self.owner, expires_at=expires_at, heartbeat_at=now
+                ))
+            except IntegrityError:
+                db.rollback()
+                return False
+        db.commit()
+        self._held[name] = expires_at
+        return True
+
+    def heartbeat(self):
+        """续约/抢占所有任务租约（由调度器周期调用）"""
+        db = SessionLocal()
+        try:
+            for name in self.names:
+                now = datetime.utcnow()
+                was_leader = self.is_leader(name)
+                if self._acquire(db, name, now):
+                    if not was_leader:
+                        print(f"[Leader] {self.owner} 获得任务租约: {name}")
+                else:
+                    if self._held.pop(name, None) is not None:
+                        print(f"[Leader] {self.owner} 失去任务租约: {name}")
+        except Exception as e:
+            db.rollback()
+            # 无法续约时主动放弃，避免多个进程同时执行
+            self._held.clear()
+            print(f"[Leader] 续约失败: {e}")
+        finally:
+            db.close()
+
+    def release(self):
+        """释放本进程持有的所有租约，便于其他进程立即接管（应用关闭时调用）"""
+        if not self._held:
+            return
+        db = SessionLocal()
+        try:
+            db.execute(
+                update(SchedulerLease)
+                .where(SchedulerLease.owner == self.owner)
+                .values(expires_at=datetime.utcnow())
+            )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"[Leader] 释放租约失败: {e}")
+        finally:
+            db.close()
+            self._held.clear()
+
+    def is_leader(self, name: str) -> bool:
+        """本进程当前是否持有指定任务的有效租约"""
+        expires_at = self._held.get(name)
+        return expires_at is not None and expires_at > datetime.utcnow()
+
+    def guard(self, name: str, func: Callable) -> Callable:
+        """包装任务函数：仅在持有租约时执行"""
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if self.is_leader(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if self.is_leader(name):
+                return func(*args, **kwargs)
+        return wrapper
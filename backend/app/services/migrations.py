@@ -0,0 +1,240 @@
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, List, Set
+from sqlalchemy import MetaData, func, inspect, insert, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlalchemy.schema import CreateTable
+from app.database import Base
+from app.models import AuditLog, HealthCheckRecord, Instance, InstanceTombstone, SchemaVersion, User, UserInstance
+from app.services.search import INSTANCE_INDEX, USER_INDEX, create_fts_index
+
+
+@dataclass(frozen=True)
+class Migration:
+    """一次数据库结构变更：版本号递增，apply 需保证可重复执行"""
+    version: int
+    name: str
+    apply: Callable[[Connection], None]
+
+
+# 按版本号排列的迁移列表
+MIGRATIONS: List[Migration] = []
+
+
+def migration(version: int, name: str):
+    """注册迁移"""
+    def decorator(func: Callable[[Connection], None]):
+        MIGRATIONS.append(Migration(version, name, func))
+        MIGRATIONS.sort(key=lambda m: m.version)
+        return func
+    return decorator
+
+
+def _columns(conn: Connection, table: str) -> Set[str]:
+    return {column["name"] for column in inspect(conn).get_columns(table)}
+
+
+def _add_columns(conn: Connection, table: str, columns):
+    """添加缺失的列（已存在的列跳过）"""
+    existing = _columns(conn, table)
+    for column, ddl in columns:
+        if column not in existing:
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+            print(f"  ✓ 已添加 {table}.{column}")
+
+
+def _backfill_defaults(conn: Connection, table, names):
+    """把指定列中的 NULL 填为模型上的默认值（只处理标量默认值）"""
+    for name in names:
+        default = table.c[name].default
+        if default is None or not default.is_scalar:
+            continue
+        conn.execute(table.update().where(table.c[name].is_(None)).values({name: default.arg}))
+
+
+# ==================== 迁移 ====================
+
+@migration(1, "add_instance_docker_fields")
+def _add_docker_fields(conn: Connection):
+    _add_columns(conn, "instances", (
+        ("container_id", "VARCHAR(100)"),
+        ("container_name", "VARCHAR(100)"),
+        ("config_path", "VARCHAR(500)"),
+        ("host_port", "INTEGER"),
+        ("container_status", "VARCHAR(50) DEFAULT 'created'"),
+    ))
+
+
+@migration(2, "add_instance_health_fields")
+def _add_health_fields(conn: Connection):
+    _add_columns(conn, "instances", (
+        ("health_status", "VARCHAR(50) DEFAULT 'unknown'"),
+        ("last_health_check", "DATETIME"),
+    ))
+
+
+@migration(3, "make_instance_url_nullable")
+def _make_url_nullable(conn: Connection):
+    url_column = next(c for c in inspect(conn).get_columns("instances") if c["name"] == "url")
+    if url_column["nullable"]:
+        return
+
+    if conn.dialect.name != "sqlite":
+        conn.execute(text("ALTER TABLE instances ALTER COLUMN url DROP NOT NULL"))
+        return
+
+    # SQLite 不支持修改列约束：按当前模型建新表、复制数据后替换旧表
+    # （连接未开启 foreign_keys，删除旧表不会级联删除 user_instances）
+    table = Instance.__table__
+    existing = _columns(conn, "instances")
+    columns = ", ".join(c.name for c in table.columns if c.name in existing)
+    conn.execute(CreateTable(table.to_metadata(MetaData(), name="instances_new")))
+    conn.execute(text(f"INSERT INTO instances_new ({columns}) SELECT {columns} FROM instances"))
+    conn.execute(text("DROP TABLE instances"))
+    conn.execute(text("ALTER TABLE instances_new RENAME TO instances"))
+    # 新表按模型建立，不带 DEFAULT 子句：旧表中没有的列（后续迁移会跳过）填入模型默认值
+    _backfill_defaults(conn, table, [c.name for c in table.columns if c.name not in existing])
+    for index in table.indexes:
+        index.create(conn, checkfirst=True)
+    print("  ✓ instances.url 已改为可为空")
+
+
+@migration(4, "add_instance_two_level_health_fields")
+def _add_two_level_health_fields(conn: Connection):
+    _add_columns(conn, "instances", (
+        ("local_health_status", "VARCHAR(50) DEFAULT 'unknown'"),
+        ("tunnel_health_status", "VARCHAR(50) DEFAULT 'unknown'"),
+        ("last_tunnel_check", "DATETIME"),
+    ))
+
+
+@migration(5, "add_user_instance_and_url_indexes")
+def _add_lookup_indexes(conn: Connection):
+    # 唯一索引建立前先清理重复的用户-实例关联，保留最早的一条
+    conn.execute(text(
+        "DELETE FROM user_instances WHERE id NOT IN (SELECT id FROM ("
+        "SELECT MIN(id) AS id FROM user_instances GROUP BY user_id, instance_id) AS keep)"
+    ))
+    for index in list(UserInstance.__table__.indexes) + list(Instance.__table__.indexes):
+        index.create(conn, checkfirst=True)
+
+
+@migration(6, "add_admin_list_indexes")
+def _add_admin_list_indexes(conn: Connection):
+    for index in list(Instance.__table__.indexes) + list(User.__table__.indexes):
+        index.create(conn, checkfirst=True)
+
+
+@migration(7, "create_audit_logs")
+def _create_audit_logs(conn: Connection):
+    AuditLog.__table__.create(conn, checkfirst=True)
+
+
+@migration(8, "create_search_indexes")
+def _create_search_indexes(conn: Connection):
+    # 全文索引仅用于 SQLite（FTS5），其他数据库搜索时回退为 LIKE 查询
+    if conn.dialect.name != "sqlite":
+        return
+    try:
+        for index in (INSTANCE_INDEX, USER_INDEX):
+            create_fts_index(conn, index)
+            print(f"  ✓ 已创建全文索引 {index.fts_table}")
+    except OperationalError as e:
+        print(f"  ⚠ SQLite 不支持 FTS5，搜索将使用 LIKE 查询: {e}")
+
+
+@migration(9, "create_instance_tombstones")
+def _create_instance_tombstones(conn: Connection):
+    InstanceTombstone.__table__.create(conn, checkfirst=True)
+
+
+@migration(10, "add_health_failure_index")
+def _add_health_failure_index(conn: Connection):
+    for index in HealthCheckRecord.__table__.indexes:
+        index.create(conn, checkfirst=True)
+
+
+@migration(11, "backfill_instance_health_defaults")
+def _backfill_instance_health_defaults(conn: Connection):
+    # 迁移 3 重建表后，已升级的旧数据库中这些列可能为 NULL
+    _backfill_defaults(conn, Instance.__table__, ("local_health_status", "tunnel_health_status"))
+
+
+# ==================== 执行 ====================
+
+def current_version(conn: Connection) -> int:
+    """当前数据库结构版本（未执行过迁移时为 0）"""
+    return conn.execute(select(func.max(SchemaVersion.version))).scalar() or 0
+
+
+@contextmanager
+def _migration_lock(conn: Connection):
+    """
+    在事务中持有迁移锁，避免多个 worker 同时执行迁移
+
+    SQLite 使用 BEGIN IMMEDIATE 获取写锁（其他进程按 busy_timeout 等待），
+    PostgreSQL 使用事务级 advisory lock，MySQL 使用 GET_LOCK。
+    """
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        # 连接为 AUTOCOMMIT 模式，由这里显式控制事务
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+        try:
+            yield
+            conn.exec_driver_sql("COMMIT")
+        except BaseException:
+            conn.exec_driver_sql("ROLLBACK")
+            raise
+        return
+
+    with conn.begin():
+        if dialect == "postgresql":
+            conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('schema_versions'))"))
+        elif dialect in ("mysql", "mariadb"):
+            conn.execute(text("SELECT GET_LOCK('schema_versions', 300)"))
+        try:
+            yield
+        finally:
+            if dialect in ("mysql", "mariadb"):
+                conn.execute(text("SELECT RELEASE_LOCK('schema_versions')"))
+
+
+def run_migrations(engine: Engine) -> int:
+    """
+    初始化表结构并执行尚未执行的迁移
+
+    已是最新版本时只做一次版本查询；否则在迁移锁内创建缺失的表、
+    重新确认版本并依次执行迁移，每个迁移执行后写入 schema_versions。
+    新增表时也需要增加迁移版本，使其在下次启动时被创建。
+
+    Returns:
+        本次执行的迁移数量
+    """
+    latest = MIGRATIONS[-1].version
+    try:
+        with engine.connect() as conn:
+            if current_version(conn) >= latest:
+                return 0
+    except DBAPIError:
+        # 新数据库，schema_versions 表尚不存在
+        pass
+
+    options = {"isolation_level": "AUTOCOMMIT"} if engine.dialect.name == "sqlite" else {}
+    with engine.connect().execution_options(**options) as conn:
+        with _migration_lock(conn):
+            Base.metadata.create_all(bind=conn)
+            # 持锁后重新读取，其他 worker 可能已完成迁移
+            version = current_version(conn)
+            pending = [m for m in MIGRATIONS if m.version > version]
+            for item in pending:
+                print(f"[Migration] 执行迁移 {item.version}: {item.name}")
+                item.apply(conn)
+                conn.execute(insert(SchemaVersion).values(
+                    version=item.version, name=item.name, applied_at=datetime.utcnow()
+                ))
+
+    if pending:
+        print(f"✓ 数据库结构已迁移到版本 {latest}")
+    return len(pending)
@@ -0,0 +1,151 @@
+from sqlalchemy import or_, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from app.core.pagination import decode_cursor, encode_cursor, keyset_page
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+import threading
+
+
+class FtsIndex(NamedTuple):
+    """全文索引定义：FTS5 表使用外部内容表，rowid 即源表 id"""
+    table: str
+    fts_table: str
+    columns: Tuple[str, ...]
+    # bm25 列权重，与 columns 一一对应，越大越重要
+    weights: Tuple[float, ...]
+
+
+INSTANCE_INDEX = FtsIndex(
+    "instances", "instances_fts", ("name", "description", "url", "container_name"), (10.0, 1.0, 3.0, 5.0)
+)
+USER_INDEX = FtsIndex("users", "users_fts", ("username",), (1.0,))
+
+# 搜索结果按相关度排序，游标中记录上一页最后一行的 bm25 分数
+SEARCH_SORT = "rank"
+
+
+def create_fts_index(conn: Connection, index: FtsIndex):
+    """
+    创建 FTS5 索引及同步触发器，并从源表重建索引内容
+
+    更新触发器只监听被索引的列，健康状态等高频更新不会写入全文索引。
+    """
+    columns = ", ".join(index.columns)
+    new_values = ", ".join(f"new.{c}" for c in index.columns)
+    old_values = ", ".join(f"old.{c}" for c in index.columns)
+    delete_old = (
+        f"INSERT INTO {index.fts_table}({index.fts_table}, rowid, {columns}) "
+        f"VALUES ('delete', old.id, {old_values});"
+    )
+    insert_new = f"INSERT INTO {index.fts_table}(rowid, {columns}) VALUES (new.id, {new_values});"
+
+    conn.execute(text(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {index.fts_table} USING fts5("
+        f"{columns}, content='{index.table}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    ))
+    conn.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS {index.fts_table}_ai AFTER INSERT ON {index.table} "
+        f"BEGIN {insert_new} END"
+    ))
+    conn.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS {index.fts_table}_ad AFTER DELETE ON {index.table} "
+        f"BEGIN {delete_old} END"
+    ))
+    conn.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS {index.fts_table}_au AFTER UPDATE OF {columns} ON {index.table} "
+        f"BEGIN {delete_old} {insert_new} END"
+    ))
+    conn.execute(text(f"INSERT INTO {index.fts_table}({index.fts_table}) VALUES ('rebuild')"))
+
+
+def match_expression(q: str) -> str:
+    """
+    将用户输入转换为 FTS5 查询：每个词作为带前缀匹配的短语，词之间为 AND
+
+    用户输入中的引号、运算符均按普通文本处理，不会被解析为 FTS5 语法。
+    """
+    return " ".join('"' + term.replace('"', '""') + '"*' for term in q.split())
+
+
+class SearchService:
+    """实例与用户的全文搜索"""
+
+    _lock = threading.Lock()
+    # 各数据库是否可用 FTS5 索引（迁移在不支持 FTS5 的库上会跳过建表）
+    _available: Dict[str, bool] = {}
+
+    @classmethod
+    def _fts_available(cls, db: Session, index: FtsIndex) -> bool:
+        bind = db.get_bind()
+        if bind.dialect.name != "sqlite":
+            return False
+        key = f"{bind.url}:{index.fts_table}"
+        with cls._lock:
+            if key not in cls._available:
+                cls._available[key] = db.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                    {"name": index.fts_table}
+                ).first() is not None
+            return cls._available[key]
+
+    @staticmethod
+    def _fts_page(db: Session, index: FtsIndex, q: str, cursor: Optional[str],
+                  limit: int) -> Tuple[List[int], Optional[str]]:
+        """按 bm25 分数（越小越相关）和 id 做游标分页，返回 (id 列表, 下一页游标)"""
+        weights = ", ".join(str(w) for w in index.weights)
+        params: Dict[str, Any] = {"match": match_expression(q), "limit": limit + 1}
+        after = ""
+        if cursor:
+            params["score"], params["last_id"] = decode_cursor(cursor, SEARCH_SORT)
+            after = "WHERE (score, id) > (:score, :last_id)"
+
+        try:
+            rows = db.execute(text(
+                f"SELECT id, score FROM ("
+                f"SELECT rowid AS id, bm25({index.fts_table}, {weights}) AS score "
+                f"FROM {index.fts_table} WHERE {index.fts_table} MATCH :match"
+                f") {after} ORDER BY score, id LIMIT :limit"
+            ), params).all()
+        except OperationalError:
+            # 输入只包含标点等无法分词的内容
+            db.rollback()
+            return [], None
+
+        if len(rows) <= limit:
+            return [row.id for row in rows], None
+        rows = rows[:limit]
+        return [row.id for row in rows], encode_cursor(SEARCH_SORT, rows[-1].score, rows[-1].id)
+
+    @staticmethod
+    def _like_page(db: Session, model, index: FtsIndex, q: str, cursor: Optional[str],
+                   limit: int) -> Tuple[List[int], Optional[str]]:
+        """非 SQLite 数据库的回退实现：每个词在任一索引列中出现即匹配，按 id 排序"""
+        query = db.query(model.id)
+        for term in q.split():
+            pattern = f"%{term}%"
+            query = query.filter(or_(*(getattr(model, c).ilike(pattern) for c in index.columns)))
+        rows, next_cursor = keyset_page(query, model, "id", cursor, limit)
+        return [row.id for row in rows], next_cursor
+
+    @classmethod
+    def search_ids(cls, db: Session, model, index: FtsIndex, q: str, cursor: Optional[str],
+                   limit: int) -> Tuple[List[int], Optional[str]]:
+        """
+        搜索匹配的行
+
+        Returns:
+            (按相关度排列的 id, 下一页游标；没有更多结果时为 None)
+        """
+        if not q.split():
+            return [], None
+        if cls._fts_available(db, index):
+            return cls._fts_page(db, index, q, cursor, limit)
+        return cls._like_page(db, model, index, q, cursor, limit)
+
+    @staticmethod
+    def in_order(rows, ids: List[int]) -> list:
+        """按搜索结果的 id 顺序排列查询出的行"""
+        position = {row_id: i for i, row_id in enumerate(ids)}
+        return sorted(rows, key=lambda row: position[row.id])
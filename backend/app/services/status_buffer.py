@@ -0,0 +1,149 @@
+from sqlalchemy import update, bindparam
+from app.models import Instance
+from app.database import SessionLocal
+from app.config import settings
+from typing import Any, Callable, Dict, List, Set
+from datetime import datetime
+import threading
+
+# 只记录时间的字段：单独变化时按时间粒度合并写入，随其他字段变化一起写入
+TIMESTAMP_FIELDS = ("last_health_check", "last_tunnel_check")
+
+_MISSING = object()
+
+
+class StatusBuffer:
+    """
+    实例状态写缓冲（write-behind）
+
+    健康检查与容器操作只把状态写入内存，缓冲会丢弃与数据库一致的无效写入，
+    同一实例的多次更新合并为一次，由后台任务定期用一条 executemany 事务批量落库。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state: Dict[int, Dict[str, Any]] = {}  # 最新状态
+        self._persisted: Dict[int, Dict[str, Any]] = {}  # 已知的数据库状态
+        self._dirty: Set[int] = set()
+        self._listeners: List[Callable[..., None]] = []
+
+    def add_listener(self, listener: Callable[..., None]):
+        """注册状态写入监听器：每次 update 后以 (instance_id, **fields) 调用"""
+        self._listeners.append(listener)
+
+    def _is_dirty(self, instance_id: int) -> bool:
+        state = self._state.get(instance_id, {})
+        persisted = self._persisted.get(instance_id, {})
+        resolution = settings.STATUS_BUFFER_TIMESTAMP_RESOLUTION_SECONDS
+        for field, value in state.items():
+            old = persisted.get(field, _MISSING)
+            if old == value:
+                continue
+            if field in TIMESTAMP_FIELDS and isinstance(old, datetime) and isinstance(value, datetime):
+                if (value - old).total_seconds() < resolution:
+                    continue
+            return True
+        return False
+
+    def observe(self, instance_id: int, **fields):
+        """登记刚从数据库读到的值，用于判断后续写入是否为无效写入"""
+        with self._lock:
+            state = self._state.setdefault(instance_id, {})
+            persisted = self._persisted.setdefault(instance_id, {})
+            for field, value in fields.items():
+                # 有未落库的修改时保留内存中的新值
+                if state.get(field, _MISSING) == persisted.get(field, _MISSING):
+                    state[field] = value
+                persisted[field] = value
+            if not self._is_dirty(instance_id):
+                self._dirty.discard(instance_id)
+
+    def update(self, instance_id: int, **fields):
+        """写入实例状态（延迟落库）"""
+        with self._lock:
+            self._state.setdefault(instance_id, {}).update(fields)
+            if self._is_dirty(instance_id):
+                self._dirty.add(instance_id)
+            else:
+                self._dirty.discard(instance_id)
+        for listener in self._listeners:
+            listener(instance_id, **fields)
+
+    def get(self, instance_id: int, field: str, default: Any = None) -> Any:
+        """读取实例的最新状态（包括尚未落库的修改）"""
+        with self._lock:
+            return self._state.get(instance_id, {}).get(field, default)
+
+    def pending(self, instance_id: int) -> Dict[str, Any]:
+        """尚未落库的字段（内存中的值与已知数据库状态不同）"""
+        with self._lock:
+            state = self._state.get(instance_id, {})
+            persisted = self._persisted.get(instance_id, {})
+            return {
+                field: value for field, value in state.items()
+                if persisted.get(field, _MISSING) != value
+            }
+
+    def forget(self, instance_id: int):
+        """丢弃实例的缓冲状态（实例被删除或状态被直接写入数据库时调用）"""
+        with self._lock:
+            self._state.pop(instance_id, None)
+            self._persisted.pop(instance_id, None)
+            self._dirty.discard(instance_id)
+
+    def flush(self) -> int:
+        """将待写入的状态批量落库，返回写入的实例数"""
+        with self._lock:
+            if not self._dirty:
+                return 0
+            # 按修改的字段组合分组，每组一条 executemany
+            groups: Dict[tuple, list] = {}
+            snapshot = {}
+            for instance_id in self._dirty:
+                state = self._state.get(instance_id, {})
+                persisted = self._persisted.get(instance_id, {})
+                changed = {
+                    field: value for field, value in state.items()
+                    if persisted.get(field, _MISSING) != value
+                }
+                if not changed:
+                    continue
+                snapshot[instance_id] = changed
+                groups.setdefault(tuple(sorted(changed)), []).append({"b_id": instance_id, **changed})
+            self._dirty.clear()
+
+        if not groups:
+            return 0
+
+        table = Instance.__table__
+        db = SessionLocal()
+        try:
+            for fields, rows in groups.items():
+                db.execute(
+                    update(table)
+                    .where(table.c.id == bindparam("b_id"))
+                    .values({field: bindparam(field) for field in fields}),
+                    rows
+                )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            # 写入失败时重新标记，等待下一次刷新
+            with self._lock:
+                self._dirty.update(snapshot)
+            print(f"[StatusBuffer] 刷新失败: {e}")
+            return 0
+        finally:
+            db.close()
+
+        with self._lock:
+            for instance_id, changed in snapshot.items():
+                if instance_id in self._state:
+                    self._persisted.setdefault(instance_id, {}).update(changed)
+                    if self._is_dirty(instance_id):
+                        self._dirty.add(instance_id)
+        return len(snapshot)
+
+
+# 进程内共享的状态缓冲
+status_buffer = StatusBuffer()
@@ -0,0 +1,263 @@
+from sqlalchemy import bindparam, delete, insert, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from pydantic import ValidationError
+from app.models import Instance, User, UserInstance, UserRole
+from app.schemas import UserCreate
+from app.core.password_hasher import password_hasher, PasswordHasherBusy
+from app.database import SessionLocal
+from app.config import settings
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+import csv
+import io
+import json
+
+# 支持的文件格式
+FORMATS = ("csv", "jsonl")
+
+# 导出文件的列（导入时读取 username、password、role、instance_ids）
+EXPORT_FIELDS = ["id", "username", "role", "created_at", "updated_at", "instance_ids"]
+
+
+def _parse_instance_ids(value: Any) -> List[int]:
+    """解析实例ID：JSONL 中为列表，CSV 中为分号分隔的字符串"""
+    if value is None or value == "":
+        return []
+    if isinstance(value, list):
+        return [int(v) for v in value]
+    return [int(v) for v in str(value).split(";") if v.strip()]
+
+
+def _read_rows(stream: BinaryIO, fmt: str) -> Iterator[Tuple[int, Optional[Dict[str, Any]]]]:
+    """逐行解析上传文件，产出 (行号, 行数据)；无法解析的行数据为 None"""
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        if fmt == "csv":
+            reader = csv.DictReader(text)
+            for row in reader:
+                yield reader.line_num, row
+        else:
+            for line_no, line in enumerate(text, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError:
+                    row = None
+                yield line_no, row if isinstance(row, dict) else None
+    finally:
+        # 上传文件由框架关闭
+        text.detach()
+
+
+def _validation_message(e: ValidationError) -> str:
+    error = e.errors()[0]
+    field = ".".join(str(part) for part in error["loc"])
+    return f"{field}: {error['msg']}" if field else error["msg"]
+
+
+class UserBulkService:
+    """用户批量操作：导入导出与实例分配"""
+
+    @staticmethod
+    def import_users(db: Session, stream: BinaryIO, fmt: str) -> Dict[str, Any]:
+        """
+        流式导入用户
+
+        用户名和实例ID各用一次查询载入内存集合做校验；合法的行按批并行哈希密码，
+        每批在一个事务中批量写入用户及其实例分配。
+
+        Returns:
+            {"created", "failed", "errors": [{"line", "username", "error"}, ...]}
+        """
+        existing = {username for (username,) in db.query(User.username)}
+        instance_ids = {instance_id for (instance_id,) in db.query(Instance.id)}
+        result: Dict[str, Any] = {"created": 0, "failed": 0, "errors": []}
+
+        def fail(line: int, username: Optional[str], error: str):
+            result["failed"] += 1
+            result["errors"].append({"line": line, "username": username, "error": error})
+
+        batch: List[Tuple[int, UserCreate, List[int]]] = []
+        for count, (line, row) in enumerate(_read_rows(stream, fmt), 1):
+            if count > settings.USER_IMPORT_MAX_ROWS:
+                fail(line, None, f"超过单次导入上限 {settings.USER_IMPORT_MAX_ROWS} 行，后续内容未处理")
+                break
+            if row is None:
+                fail(line, None, "无法解析该行")
+                continue
+
+            username = row.get("username")
+            try:
+                user_data = UserCreate(
+                    username=username,
+                    password=row.get("password"),
+                    role=row.get("role") or UserRole.USER
+                )
+                assigned = sorted(set(_parse_instance_ids(row.get("instance_ids"))))
+            except ValidationError as e:
+                fail(line, username, _validation_message(e))
+                continue
+            except (TypeError, ValueError):
+                fail(line, username, "instance_ids 格式错误")
+                continue
+
+            if user_data.username in existing:
+                fail(line, username, "用户名已存在")
+                continue
+            missing = [i for i in assigned if i not in instance_ids]
+            if missing:
+                fail(line, username, f"实例不存在: {missing}")
+                continue
+
+            existing.add(user_data.username)
+            batch.append((line, user_data, assigned))
+            if len(batch) >= settings.USER_IMPORT_BATCH_SIZE:
+                UserBulkService._write_batch(db, batch, result, fail)
+                batch = []
+
+        if batch:
+            UserBulkService._write_batch(db, batch, result, fail)
+        return result
+
+    @staticmethod
+    def _write_batch(db: Session, batch, result: Dict[str, Any], fail):
+        """并行哈希一批密码并在一个事务中写入；失败时整批记为失败行"""
+        try:
+            hashes = password_hasher.hash_many([user_data.password for _, user_data, _ in batch])
+            user_ids = db.execute(
+                insert(User).returning(User.id, sort_by_parameter_order=True),
+                [
+                    {"username": user_data.username, "password_hash": password_hash, "role": user_data.role}
+                    for (_, user_data, _), password_hash in zip(batch, hashes)
+                ]
+            ).scalars().all()
+
+            assignments = [
+                {"user_id": user_id, "instance_id": instance_id}
+                for user_id, (_, _, assigned) in zip(user_ids, batch)
+                for instance_id in assigned
+            ]
+            if assignments:
+                db.execute(insert(UserInstance), assignments)
+            db.commit()
+            result["created"] += len(batch)
+        except (SQLAlchemyError, PasswordHasherBusy) as e:
+            db.rollback()
+            error = "密码哈希队列已满，请稍后重试" if isinstance(e, PasswordHasherBusy) else f"写入失败: {e.__class__.__name__}"
+            for line, user_data, _ in batch:
+                fail(line, user_data.username, error)
+
+    @staticmethod
+    def apply_assignments(db: Session, assignments: Dict[int, Iterable[int]]) -> Dict[str, Any]:
+        """
+        按差集更新用户的实例分配（不提交，由调用方统一提交）
+
+        assignments 为 {user_id: 该用户最终应拥有的实例ID}；一次查询读出当前分配，
+        只删除多余的关联、插入缺少的关联，未变化的行不做改动。
+
+        Returns:
+            {"added", "removed", "changed_user_ids"}
+        """
+        target: Dict[int, Set[int]] = {user_id: set(ids) for user_id, ids in assignments.items()}
+        current: Dict[int, Set[int]] = defaultdict(set)
+        if target:
+            rows = db.query(UserInstance.user_id, UserInstance.instance_id).filter(
+                UserInstance.user_id.in_(list(target))
+            )
+            for user_id, instance_id in rows:
+                current[user_id].add(instance_id)
+
+        to_add = [
+            {"user_id": user_id, "instance_id": instance_id}
+            for user_id, ids in target.items()
+            for instance_id in sorted(ids - current[user_id])
+        ]
+        to_remove = [
+            {"b_user_id": user_id, "b_instance_id": instance_id}
+            for user_id, ids in target.items()
+            for instance_id in sorted(current[user_id] - ids)
+        ]
+
+        if to_remove:
+            table = UserInstance.__table__
+            db.execute(
+                delete(table).where(
+                    table.c.user_id == bindparam("b_user_id"),
+                    table.c.instance_id == bindparam("b_instance_id")
+                ),
+                to_remove
+            )
+        if to_add:
+            db.execute(insert(UserInstance), to_add)
+
+        changed = {row["user_id"] for row in to_add} | {row["b_user_id"] for row in to_remove}
+        UserBulkService.touch_users(db, changed)
+        return {"added": len(to_add), "removed": len(to_remove), "changed_user_ids": sorted(changed)}
+
+    @staticmethod
+    def touch_users(db: Session, user_ids: Iterable[int]):
+        """
+        更新用户的 updated_at（不提交）
+
+        实例分配属于用户数据的一部分，分配变化时推进 updated_at，
+        使用户列表的 ETag 和按 updated_at 排序的结果随之变化。
+        """
+        user_ids = list(user_ids)
+        if user_ids:
+            db.execute(
+                update(User).where(User.id.in_(user_ids)).values(updated_at=datetime.utcnow()),
+                execution_options={"synchronize_session": False}
+            )
+
+    @staticmethod
+    def export_users(fmt: str) -> Iterator[str]:
+        """
+        流式导出用户及其实例分配（不含密码哈希）
+
+        按 id 分批读取，每批只保留当前批的数据；使用独立的会话，
+        以便在响应发送期间持续读取。
+        """
+        db = SessionLocal()
+        try:
+            if fmt == "csv":
+                yield ",".join(EXPORT_FIELDS) + "\r\n"
+
+            last_id = 0
+            while True:
+                users = db.query(
+                    User.id, User.username, User.role, User.created_at, User.updated_at
+                ).filter(User.id > last_id).order_by(User.id).limit(settings.USER_EXPORT_BATCH_SIZE).all()
+                if not users:
+                    break
+
+                assigned: Dict[int, List[int]] = defaultdict(list)
+                rows = db.query(UserInstance.user_id, UserInstance.instance_id).filter(
+                    UserInstance.user_id.in_([user.id for user in users])
+                ).order_by(UserInstance.user_id, UserInstance.instance_id)
+                for user_id, instance_id in rows:
+                    assigned[user_id].append(instance_id)
+
+                buffer = io.StringIO()
+                writer = csv.writer(buffer) if fmt == "csv" else None
+                for user in users:
+                    record = {
+                        "id": user.id,
+                        "username": user.username,
+                        "role": user.role.value,
+                        "created_at": user.created_at.isoformat(),
+                        "updated_at": user.updated_at.isoformat(),
+                        "instance_ids": assigned.get(user.id, []),
+                    }
+                    if writer is not None:
+                        record["instance_ids"] = ";".join(str(i) for i in record["instance_ids"])
+                        writer.writerow([record[field] for field in EXPORT_FIELDS])
+                    else:
+                        buffer.write(json.dumps(record, ensure_ascii=False) + "\n")
+                yield buffer.getvalue()
+
+                last_id = users[-1].id
+        finally:
+            db.close()
@@ -0,0 +1,136 @@
+"""
+实例状态表压测脚本 - 对比后台持续写入时实例列表从数据库读取与从进程内状态表读取的延迟
+
+在临时 SQLite 数据库中写入实例，后台线程模拟健康检查与容器操作：持续经状态缓冲写入状态、
+定期批量落库并增量同步状态表。期间分别执行：
+1. db：按管理员列表接口原来的做法查询一页普通列行并用 orjson 编码；
+2. store：从进程内状态表筛选、排序一页并用 orjson 编码（列表接口当前的做法）。
+统计两种路径的中位数、p95 与最大耗时。
+
+运行方式：
+python benchmark_fleet_state.py
+python benchmark_fleet_state.py --instances 5000 --requests 500 --output fleet_state.json
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+
+def seed(engine, rows):
+    """写入测试数据"""
+    from sqlalchemy import insert
+    from app.models import Instance
+
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(Instance), [
+            {"name": f"instance_{i}", "url": f"https://example.com/{i}", "container_id": f"{i:064x}",
+             "container_status": "running", "health_status": "healthy",
+             "created_at": now - timedelta(days=1), "updated_at": now - timedelta(seconds=i)}
+            for i in range(rows)
+        ])
+
+
+def summarize(latencies):
+    latencies = sorted(latencies)
+    return {
+        "median_ms": round(statistics.median(latencies), 2),
+        "p95_ms": round(latencies[max(0, int(len(latencies) * 0.95) - 1)], 2),
+        "max_ms": round(latencies[-1], 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="实例状态表压测")
+    parser.add_argument("--instances", type=int, default=2000, help="实例数量")
+    parser.add_argument("--requests", type=int, default=300, help="每种路径的读取次数")
+    parser.add_argument("--limit", type=int, default=100, help="每页数量")
+    parser.add_argument("--output", help="结果保存为 JSON 文件")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="fleet_state_benchmark_")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'fleet.db')}"
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    from app.core.pagination import keyset_page
+    from app.core.serialization import json_response, response_columns
+    from app.database import SessionLocal, engine
+    from app.models import Instance
+    from app.schemas import InstanceResponse
+    from app.services.fleet_state import fleet_state
+    from app.services.migrations import run_migrations
+    from app.services.status_buffer import status_buffer
+
+    run_migrations(engine)
+    seed(engine, args.instances)
+    fleet_state.load()
+    columns = response_columns(Instance, InstanceResponse)
+
+    stop = threading.Event()
+    writes = {"updates": 0, "flushes": 0}
+
+    def writer():
+        """模拟健康检查结果与容器操作：持续写入状态，定期落库并同步"""
+        last_flush = time.perf_counter()
+        while not stop.is_set():
+            for _ in range(50):
+                status_buffer.update(
+                    random.randint(1, args.instances),
+                    health_status=random.choice(("healthy", "unhealthy")),
+                    container_status=random.choice(("running", "exited")),
+                    last_health_check=datetime.utcnow()
+                )
+                writes["updates"] += 1
+            if time.perf_counter() - last_flush > 0.2:
+                status_buffer.flush()
+                fleet_state.sync()
+                writes["flushes"] += 1
+                last_flush = time.perf_counter()
+            time.sleep(0.005)
+
+    def db_path():
+        db = SessionLocal()
+        try:
+            query = db.query(*columns).filter(Instance.health_status == "healthy")
+            rows, _ = keyset_page(query, Instance, "-updated_at", None, args.limit)
+            return json_response([row._asdict() for row in rows]).body
+        finally:
+            db.close()
+
+    def store_path():
+        instances, _ = fleet_state.page("-updated_at", None, args.limit, health_status="healthy")
+        return json_response(instances).body
+
+    thread = threading.Thread(target=writer, daemon=True)
+    thread.start()
+    results = {}
+    try:
+        for name, func in (("db", db_path), ("store", store_path)):
+            latencies = []
+            for _ in range(args.requests):
+                started = time.perf_counter()
+                func()
+                latencies.append((time.perf_counter() - started) * 1000)
+            results[name] = summarize(latencies)
+            print(f"[Benchmark] {name}: median {results[name]['median_ms']}ms, "
+                  f"p95 {results[name]['p95_ms']}ms, max {results[name]['max_ms']}ms")
+    finally:
+        stop.set()
+        thread.join()
+    print(f"[Benchmark] 压测期间写入 {writes['updates']} 次状态，落库并同步 {writes['flushes']} 次")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"params": vars(args), "results": results, "writes": writes}, f, ensure_ascii=False, indent=2)
+        print(f"[Benchmark] 结果已保存: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
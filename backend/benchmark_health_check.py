@@ -0,0 +1,318 @@
+"""
+健康检查压测脚本 - 模拟大量实例，评估 HealthCheckService.check_all_instances 的表现
+
+在独立进程中启动若干本地 asyncio HTTP 服务（可配置延迟、错误率、挂起比例），
+向临时 SQLite 数据库写入 N 个指向这些服务的 Instance，然后执行多轮完整健康检查，
+统计每轮耗时、Python 内存峰值、打开的套接字峰值以及数据库写入耗时。
+
+运行方式：
+python benchmark_health_check.py --instances 2000 --cycles 3
+python benchmark_health_check.py --instances 2000 --output baseline.json
+python benchmark_health_check.py --instances 2000 --baseline baseline.json --max-regression 0.2
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+
+# ==================== 模拟实例服务（子进程） ====================
+
+async def _serve(profiles, server_count, port_queue):
+    """启动 server_count 个 HTTP 服务，按路径决定每个实例的行为"""
+
+    async def handle(reader, writer):
+        try:
+            while True:
+                request = await reader.readuntil(b"\r\n\r\n")
+                method, path, _ = request.split(b"\r\n", 1)[0].split(b" ", 2)
+                kind, latency = profiles.get(path.decode(), ("ok", 0.0))
+
+                if kind == "hang":
+                    # 不响应，直到客户端超时断开
+                    await reader.read()
+                    break
+
+                if latency:
+                    await asyncio.sleep(latency)
+                status = "500 Internal Server Error" if kind == "error" else "200 OK"
+                body = b"" if method == b"HEAD" else b"ok"
+                writer.write(
+                    f"HTTP/1.1 {status}\r\nContent-Length: 2\r\nConnection: keep-alive\r\n\r\n".encode() + body
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    servers = [await asyncio.start_server(handle, "127.0.0.1", 0, backlog=4096) for _ in range(server_count)]
+    port_queue.put([server.sockets[0].getsockname()[1] for server in servers])
+    await asyncio.Event().wait()
+
+
+def _server_main(profiles, server_count, port_queue):
+    _raise_fd_limit()
+    asyncio.run(_serve(profiles, server_count, port_queue))
+
+
+def _raise_fd_limit():
+    """将文件描述符软限制提升到硬限制，避免大量连接时报错"""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+def build_profiles(args):
+    """为每个实例生成确定性的行为：ok / error / hang 及响应延迟"""
+    rng = random.Random(args.seed)
+    profiles = {}
+    for i in range(args.instances):
+        r = rng.random()
+        if r < args.hang_rate:
+            kind = "hang"
+        elif r < args.hang_rate + args.error_rate:
+            kind = "error"
+        else:
+            kind = "ok"
+        latency = rng.uniform(args.latency_min, args.latency_max) / 1000.0
+        profiles[f"/instance/{i}"] = (kind, latency)
+    return profiles
+
+
+# ==================== 采样工具 ====================
+
+def count_open_sockets():
+    """统计当前进程打开的套接字数量（仅 Linux）"""
+    fd_dir = "/proc/self/fd"
+    if not os.path.isdir(fd_dir):
+        return None
+    count = 0
+    for fd in os.listdir(fd_dir):
+        try:
+            if os.readlink(os.path.join(fd_dir, fd)).startswith("socket:"):
+                count += 1
+        except OSError:
+            pass
+    return count
+
+
+async def sample_sockets(peak, interval=0.02):
+    """后台采样套接字数量峰值"""
+    while True:
+        current = count_open_sockets()
+        if current is not None:
+            peak[0] = max(peak[0], current)
+        await asyncio.sleep(interval)
+
+
+# ==================== 压测主流程 ====================
+
+def seed_database(args, ports):
+    """写入 N 个指向模拟服务的实例"""
+    from app.database import init_db, SessionLocal
+    from app.models import Instance
+
+    init_db()
+    db = SessionLocal()
+    try:
+        now = datetime.utcnow()
+        db.bulk_insert_mappings(Instance, [
+            {
+                "name": f"bench_{i}",
+                "url": f"http://127.0.0.1:{ports[i % len(ports)]}/instance/{i}",
+                "health_status": "unknown",
+                "created_at": now,
+                "updated_at": now,
+            }
+            for i in range(args.instances)
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+
+async def run_cycles(args):
+    """执行多轮健康检查并收集指标"""
+    from sqlalchemy import event
+    from sqlalchemy.orm import Session
+    from app.database import async_engine, engine
+    from app.services.health_checker import HealthCheckService
+    from app.services.status_buffer import status_buffer
+
+    # 统计数据库写入耗时：写语句本身（状态缓冲的批量 UPDATE、探测记录的批量 INSERT）加上 COMMIT
+    db_write = {"seconds": 0.0, "started": None}
+
+    def _before_execute(conn, cursor, statement, parameters, context, executemany):
+        if not statement.lstrip().upper().startswith("SELECT"):
+            conn.info["bench_started"] = time.perf_counter()
+
+    def _after_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.pop("bench_started", None)
+        if started is not None:
+            db_write["seconds"] += time.perf_counter() - started
+
+    for target in (engine, async_engine.sync_engine):
+        event.listen(target, "before_cursor_execute", _before_execute)
+        event.listen(target, "after_cursor_execute", _after_execute)
+
+    @event.listens_for(Session, "before_commit")
+    def _before_commit(session):
+        db_write["started"] = time.perf_counter()
+
+    @event.listens_for(Session, "after_commit")
+    def _after_commit(session):
+        if db_write["started"] is not None:
+            db_write["seconds"] += time.perf_counter() - db_write["started"]
+            db_write["started"] = None
+
+    await HealthCheckService.start_client()
+    cycles = []
+    try:
+        for cycle in range(args.cycles):
+            db_write["seconds"] = 0.0
+            peak_sockets = [count_open_sockets() or 0]
+            sampler = asyncio.create_task(sample_sockets(peak_sockets))
+            tracemalloc.start()
+
+            started = time.perf_counter()
+            await HealthCheckService.check_all_instances()
+            status_buffer.flush()
+            wall = time.perf_counter() - started
+
+            _, peak_mem = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            sampler.cancel()
+
+            cycles.append({
+                "cycle": cycle + 1,
+                "wall_seconds": round(wall, 3),
+                "db_write_seconds": round(db_write["seconds"], 3),
+                "peak_python_memory_mb": round(peak_mem / 1024 / 1024, 2),
+                "peak_open_sockets": peak_sockets[0] if count_open_sockets() is not None else None,
+            })
+            print(f"[Benchmark] 第 {cycle + 1} 轮: {cycles[-1]}")
+    finally:
+        await HealthCheckService.close_client()
+        # 释放 aiosqlite 连接，否则其后台线程会阻止进程退出
+        await async_engine.dispose()
+    return cycles
+
+
+def summarize(cycles):
+    """各指标取中位数"""
+    keys = ["wall_seconds", "db_write_seconds", "peak_python_memory_mb", "peak_open_sockets"]
+    summary = {}
+    for key in keys:
+        values = [c[key] for c in cycles if c[key] is not None]
+        summary[key] = round(statistics.median(values), 3) if values else None
+    summary["max_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 2)
+    return summary
+
+
+def compare(summary, baseline_path, max_regression):
+    """与基线比较，返回是否存在超出阈值的退化"""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)["summary"]
+
+    regressed = False
+    print("\n指标对比（当前 / 基线）:")
+    for key, value in summary.items():
+        base = baseline.get(key)
+        if value is None or not base:
+            print(f"  {key}: {value} / {base}")
+            continue
+        change = (value - base) / base
+        flag = ""
+        if key == "wall_seconds" and change > max_regression:
+            flag = "  ⚠ 退化"
+            regressed = True
+        print(f"  {key}: {value} / {base} ({change:+.1%}){flag}")
+    return regressed
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="健康检查压测")
+    parser.add_argument("--instances", type=int, default=2000, help="模拟实例数量")
+    parser.add_argument("--cycles", type=int, default=3, help="健康检查轮数")
+    parser.add_argument("--servers", type=int, default=8, help="模拟服务进程内的监听端口数")
+    parser.add_argument("--latency-min", type=float, default=5.0, help="最小响应延迟（毫秒）")
+    parser.add_argument("--latency-max", type=float, default=200.0, help="最大响应延迟（毫秒）")
+    parser.add_argument("--error-rate", type=float, default=0.05, help="返回 500 的实例比例")
+    parser.add_argument("--hang-rate", type=float, default=0.01, help="不响应（直到超时）的实例比例")
+    parser.add_argument("--timeout", type=float, default=None, help="覆盖 HEALTH_CHECK_TIMEOUT（秒）")
+    parser.add_argument("--concurrency", type=int, default=None, help="覆盖 HEALTH_CHECK_CONCURRENCY")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    parser.add_argument("--output", help="结果保存路径（JSON）")
+    parser.add_argument("--baseline", help="用于对比的基线结果（JSON）")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="允许的耗时退化比例")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    _raise_fd_limit()
+
+    # 必须在导入 app 之前设置，使用临时数据库并关闭本地探测
+    workdir = tempfile.mkdtemp(prefix="health_bench_")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["HEALTH_CHECK_LOCAL_MODE"] = "off"
+    if args.timeout is not None:
+        os.environ["HEALTH_CHECK_TIMEOUT"] = str(args.timeout)
+    if args.concurrency is not None:
+        os.environ["HEALTH_CHECK_CONCURRENCY"] = str(args.concurrency)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    profiles = build_profiles(args)
+    port_queue = multiprocessing.Queue()
+    server = multiprocessing.Process(
+        target=_server_main, args=(profiles, args.servers, port_queue), daemon=True
+    )
+    server.start()
+
+    try:
+        ports = port_queue.get(timeout=30)
+        print(f"[Benchmark] 模拟服务已启动，端口: {ports}")
+
+        seed_database(args, ports)
+        print(f"[Benchmark] 已写入 {args.instances} 个实例，数据库: {workdir}")
+
+        cycles = asyncio.run(run_cycles(args))
+    finally:
+        server.terminate()
+        server.join()
+
+    from app.config import settings
+    result = {
+        "created_at": datetime.utcnow().isoformat(),
+        "params": {
+            **vars(args),
+            "timeout": settings.HEALTH_CHECK_TIMEOUT,
+            "concurrency": settings.HEALTH_CHECK_CONCURRENCY,
+            "max_connections": settings.HEALTH_CHECK_MAX_CONNECTIONS,
+        },
+        "cycles": cycles,
+        "summary": summarize(cycles),
+    }
+    print(f"\n[Benchmark] 汇总（中位数）: {result['summary']}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"[Benchmark] 结果已保存: {args.output}")
+
+    if args.baseline and compare(result["summary"], args.baseline, args.max_regression):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+列表序列化压测脚本 - 对比响应模型路径与普通行 + orjson 路径的实例列表耗时
+
+在临时 SQLite 数据库中写入实例，对每个数据量分别执行：
+1. model：查询 ORM 对象，按 FastAPI 的 response_model 流程逐行校验为 InstanceResponse 后用 json 编码；
+2. fast：按 InstanceResponse 字段顺序查询普通列行，用 orjson 直接编码为字节（列表接口当前的做法）。
+统计查询 + 编码的中位数与 p95 耗时，并确认两种路径输出的 JSON 内容一致。
+
+运行方式：
+python benchmark_serialization.py
+python benchmark_serialization.py --sizes 1000 10000 --repeat 20 --output serialization.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+
+def seed(engine, rows):
+    """写入测试数据"""
+    from sqlalchemy import insert
+    from app.models import Instance
+
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(Instance), [
+            {"name": f"instance_{i}", "url": f"https://example.com/{i}", "description": f"实例 {i}",
+             "container_id": f"{i:064x}", "container_name": f"alas_{i}", "config_path": f"/home/nero/alas/alas_{i}/config",
+             "host_port": 30000 + i % 20000, "container_status": "running", "health_status": "healthy",
+             "last_health_check": now, "local_health_status": "healthy", "tunnel_health_status": "healthy",
+             "last_tunnel_check": now, "created_at": now - timedelta(days=1), "updated_at": now}
+            for i in range(rows)
+        ])
+
+
+def measure(func, repeat):
+    """执行 repeat 次，返回 (最后一次结果, 统计)"""
+    latencies = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    return result, {
+        "median_ms": round(statistics.median(latencies), 2),
+        "p95_ms": round(latencies[max(0, int(len(latencies) * 0.95) - 1)], 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="列表序列化压测")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000], help="实例数量")
+    parser.add_argument("--repeat", type=int, default=10, help="每种路径执行次数")
+    parser.add_argument("--output", help="结果保存为 JSON 文件")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="serialization_benchmark_")
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    from typing import List
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+    from fastapi.utils import create_response_field
+    from app.core.serialization import json_response, response_columns
+    from app.database import build_engine
+    from app.models import Instance
+    from app.schemas import InstanceResponse
+    from app.services.migrations import run_migrations
+    from sqlalchemy.orm import sessionmaker
+
+    field = create_response_field(name="Response", type_=List[InstanceResponse])
+    columns = response_columns(Instance, InstanceResponse)
+
+    results = {}
+    for size in args.sizes:
+        engine = build_engine(f"sqlite:///{os.path.join(workdir, f'{size}.db')}")
+        run_migrations(engine)
+        seed(engine, size)
+        db = sessionmaker(bind=engine)()
+
+        def model_path():
+            db.expunge_all()
+            instances = db.query(Instance).order_by(Instance.id).all()
+            content = asyncio.run(serialize_response(field=field, response_content=instances, is_coroutine=True))
+            return JSONResponse(content).body
+
+        def fast_path():
+            rows = db.query(*columns).order_by(Instance.id).all()
+            return json_response([row._asdict() for row in rows]).body
+
+        model_body, model_stats = measure(model_path, args.repeat)
+        fast_body, fast_stats = measure(fast_path, args.repeat)
+        db.close()
+        engine.dispose()
+
+        same = json.loads(model_body) == json.loads(fast_body)
+        speedup = round(model_stats["median_ms"] / fast_stats["median_ms"], 2) if fast_stats["median_ms"] else None
+        results[size] = {"model": model_stats, "fast": fast_stats, "speedup": speedup, "same_output": same}
+        print(f"[Benchmark] {size} 行: model {model_stats['median_ms']}ms (p95 {model_stats['p95_ms']}ms), "
+              f"fast {fast_stats['median_ms']}ms (p95 {fast_stats['p95_ms']}ms), {speedup}x, "
+              f"输出{'一致' if same else '不一致'}")
+        if not same:
+            sys.exit(1)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"params": vars(args), "results": results}, f, ensure_ascii=False, indent=2)
+        print(f"[Benchmark] 结果已保存: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+SQLite 并发压测脚本 - 对比默认引擎与调优引擎（WAL + PRAGMA + 连接池）的读写吞吐
+
+在临时数据库中写入 N 个实例与用户分配关系，然后用若干读线程（实例列表查询）
+和写线程（更新健康状态）并发运行固定时长，分别统计两种引擎配置下的吞吐、p95 延迟和锁等待错误。
+
+运行方式：
+python benchmark_sqlite.py
+python benchmark_sqlite.py --instances 5000 --readers 8 --writers 2 --duration 10 --output sqlite.json
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+
+def seed(engine, instances, users):
+    """写入测试数据"""
+    from sqlalchemy import insert
+    from app.database import Base
+    from app.models import Instance, User, UserInstance, UserRole
+
+    Base.metadata.create_all(bind=engine)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(User.__table__), [
+            {"username": f"user_{i}", "password_hash": "x", "role": UserRole.USER.name,
+             "created_at": now, "updated_at": now}
+            for i in range(users)
+        ])
+        conn.execute(insert(Instance.__table__), [
+            {"name": f"instance_{i}", "url": f"https://example.com/{i}", "health_status": "unknown",
+             "container_status": "running", "created_at": now, "updated_at": now}
+            for i in range(instances)
+        ])
+        conn.execute(insert(UserInstance.__table__), [
+            {"user_id": i % users + 1, "instance_id": i + 1, "created_at": now}
+            for i in range(instances)
+        ])
+
+
+def run_workload(engine, args):
+    """并发读写固定时长，返回统计结果"""
+    from sqlalchemy import text
+
+    read_sql = text(
+        "SELECT instances.* FROM instances JOIN user_instances ON user_instances.instance_id = instances.id "
+        "WHERE user_instances.user_id = :user_id"
+    )
+    write_sql = text(
+        "UPDATE instances SET health_status = :status, last_health_check = :now WHERE id = :id"
+    )
+
+    stop = threading.Event()
+    lock = threading.Lock()
+    stats = {"read": [], "write": [], "errors": 0}
+
+    def reader(seed_value):
+        latencies = []
+        i = seed_value
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                with engine.connect() as conn:
+                    conn.execute(read_sql, {"user_id": i % args.users + 1}).fetchall()
+                latencies.append(time.perf_counter() - started)
+            except Exception:
+                with lock:
+                    stats["errors"] += 1
+            i += 1
+        with lock:
+            stats["read"].extend(latencies)
+
+    def writer(seed_value):
+        latencies = []
+        i = seed_value
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                with engine.begin() as conn:
+                    conn.execute(write_sql, [
+                        {"id": (i * args.batch + k) % args.instances + 1,
+                         "status": "healthy" if i % 2 else "unhealthy",
+                         "now": datetime.utcnow()}
+                        for k in range(args.batch)
+                    ])
+                latencies.append(time.perf_counter() - started)
+            except Exception:
+                with lock:
+                    stats["errors"] += 1
+            i += 1
+        with lock:
+            stats["write"].extend(latencies)
+
+    threads = [threading.Thread(target=reader, args=(n,)) for n in range(args.readers)]
+    threads += [threading.Thread(target=writer, args=(n,)) for n in range(args.writers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    def summarize(latencies):
+        if not latencies:
+            return {"ops_per_second": 0, "p50_ms": None, "p95_ms": None}
+        latencies.sort()
+        return {
+            "ops_per_second": round(len(latencies) / args.duration, 1),
+            "p50_ms": round(statistics.median(latencies) * 1000, 2),
+            "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 2),
+        }
+
+    return {
+        "read": summarize(stats["read"]),
+        "write": summarize(stats["write"]),
+        "errors": stats["errors"],
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="SQLite 并发压测")
+    parser.add_argument("--instances", type=int, default=2000, help="实例数量")
+    parser.add_argument("--users", type=int, default=200, help="用户数量")
+    parser.add_argument("--readers", type=int, default=8, help="读线程数")
+    parser.add_argument("--writers", type=int, default=2, help="写线程数")
+    parser.add_argument("--batch", type=int, default=50, help="每次写事务更新的行数")
+    parser.add_argument("--duration", type=float, default=5.0, help="每种配置的运行时长（秒）")
+    parser.add_argument("--output", help="结果保存路径（JSON）")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    workdir = tempfile.mkdtemp(prefix="sqlite_bench_")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'app.db')}"
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    from sqlalchemy import create_engine
+    from app.database import build_engine
+
+    results = {}
+    profiles = {
+        # 调整前：仅 check_same_thread=False，回滚日志模式
+        "default": lambda url: create_engine(url, connect_args={"check_same_thread": False}),
+        # 调整后：app.database 中的 SQLite 配置
+        "tuned": build_engine,
+    }
+    for name, factory in profiles.items():
+        url = f"sqlite:///{os.path.join(workdir, name + '.db')}"
+        engine = factory(url)
+        seed(engine, args.instances, args.users)
+        results[name] = run_workload(engine, args)
+        engine.dispose()
+        print(f"[Benchmark] {name}: {results[name]}")
+
+    for kind in ("read", "write"):
+        before = results["default"][kind]["ops_per_second"]
+        after = results["tuned"][kind]["ops_per_second"]
+        if before:
+            print(f"[Benchmark] {kind} 吞吐: {before} -> {after} ops/s ({after / before:.2f}x)")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"params": vars(args), "results": results}, f, ensure_ascii=False, indent=2)
+        print(f"[Benchmark] 结果已保存: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
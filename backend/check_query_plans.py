@@ -0,0 +1,246 @@
+"""
+查询检查脚本 - 检查热点查询计划与接口查询次数，出现退化时以非零状态退出
+
+在临时 SQLite 数据库中执行全部迁移并写入少量数据（ANALYZE 后规划器才会按真实分布选择索引），
+然后：
+1. 对 build_hot_queries 中的查询执行 EXPLAIN QUERY PLAN，出现全表扫描即失败；
+2. 直接调用 build_query_budgets 中的接口函数并统计执行的 SQL 条数，超出上限即失败（防止 N+1）。
+新增热点查询、列表接口或修改索引后运行一次，可接入 CI。
+
+运行方式：
+python check_query_plans.py
+python check_query_plans.py --verbose
+"""
+import argparse
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+
+def build_hot_queries():
+    """热点查询：名称 -> SQLAlchemy 语句（参数取任意代表值）"""
+    from sqlalchemy import delete, func, select, tuple_
+    from app.core.pagination import prefix_filter
+    from app.models import AuditLog, HealthCheckRecord, Instance, InstanceTombstone, User, UserInstance
+
+    now = datetime.utcnow()
+    return {
+        # 管理员列表：按状态筛选后的游标翻页
+        "instances_page_by_health": select(Instance).where(
+            Instance.health_status == "healthy", Instance.id > 100
+        ).order_by(Instance.id).limit(101),
+        "instances_page_by_container": select(Instance).where(
+            Instance.container_status == "running", Instance.id > 100
+        ).order_by(Instance.id).limit(101),
+        # 管理员列表：按更新时间降序翻页
+        "instances_page_by_updated_at": select(Instance).where(
+            tuple_(Instance.updated_at, Instance.id) < (now, 100)
+        ).order_by(Instance.updated_at.desc(), Instance.id.desc()).limit(101),
+        "users_page_by_updated_at": select(User.id).where(
+            tuple_(User.updated_at, User.id) > (now - timedelta(days=1), 10)
+        ).order_by(User.updated_at, User.id).limit(101),
+        # 管理员列表：名称前缀搜索
+        "instances_by_name_prefix": select(Instance).where(prefix_filter(Instance.name, "instance_1")),
+        "users_by_username_prefix": select(User.id).where(prefix_filter(User.username, "user_1")),
+        # 认证缓存加载用户可访问的实例
+        "auth_principal_instances": select(UserInstance.instance_id).where(UserInstance.user_id == 1),
+        # 登录 / 认证按用户名查找
+        "user_by_username": select(User.id).where(User.username == "user_1"),
+        # 取消单个实例权限
+        "revoke_instance": select(UserInstance).where(
+            UserInstance.user_id == 1, UserInstance.instance_id == 1
+        ),
+        # 分配实例时清除用户现有关联
+        "assign_clear_user": delete(UserInstance).where(UserInstance.user_id == 1),
+        # 删除实例时级联加载关联
+        "instance_assignments": select(UserInstance).where(UserInstance.instance_id == 1),
+        # 用户实例列表
+        "user_instances": select(Instance).where(Instance.id.in_([1, 2, 3])),
+        # 按远程 URL 查找实例
+        "instance_by_url": select(Instance.id).where(Instance.url == "https://example.com/1"),
+        # 单实例健康趋势的原始记录
+        "instance_health_raw": select(HealthCheckRecord.healthy, HealthCheckRecord.latency_ms).where(
+            HealthCheckRecord.instance_id == 1,
+            HealthCheckRecord.checked_at >= now - timedelta(hours=1)
+        ),
+        # 实例列表增量同步（进程内实例状态表的后台同步使用同样的查询）
+        "instance_changes": select(Instance).where(Instance.updated_at > now - timedelta(seconds=65)),
+        "user_instance_changes": select(Instance).where(
+            Instance.id.in_([1, 2, 3]), Instance.updated_at > now - timedelta(seconds=65)
+        ),
+        "instance_tombstones": select(InstanceTombstone.instance_id).where(
+            InstanceTombstone.deleted_at > now - timedelta(seconds=65)
+        ),
+        # 仪表盘：最近探测失败的实例
+        "dashboard_recent_failures": select(HealthCheckRecord.instance_id, func.count(HealthCheckRecord.id)).where(
+            HealthCheckRecord.checked_at >= now - timedelta(hours=24), HealthCheckRecord.healthy.is_(False)
+        ).group_by(HealthCheckRecord.instance_id),
+        # 审计日志：按操作者 / 时间范围倒序翻页
+        "audit_logs_by_actor": select(AuditLog).where(
+            AuditLog.actor_id == 1, AuditLog.created_at >= now - timedelta(days=1)
+        ).order_by(AuditLog.created_at.desc(), AuditLog.id.desc()).limit(101),
+        "audit_logs_by_time": select(AuditLog).where(
+            tuple_(AuditLog.created_at, AuditLog.id) < (now, 100)
+        ).order_by(AuditLog.created_at.desc(), AuditLog.id.desc()).limit(101),
+        "audit_logs_by_target": select(AuditLog).where(
+            AuditLog.target_type == "instance", AuditLog.target_id == 1
+        ).order_by(AuditLog.created_at.desc(), AuditLog.id.desc()).limit(101),
+        # 审计日志保留期清理
+        "audit_logs_purge": select(AuditLog.id).where(
+            AuditLog.created_at < now - timedelta(days=180)
+        ).limit(5000),
+    }
+
+
+def build_query_budgets():
+    """接口调用：名称 -> (调用函数, 允许执行的 SQL 条数上限)"""
+    from fastapi import Request, Response
+    from app.api import admin
+
+    def request(path):
+        return Request({"type": "http", "method": "GET", "path": path, "query_string": b"", "headers": []})
+
+    return {
+        # 数据版本（ETag）+ 用户列表 + 实例分配
+        "admin.get_users(limit=100)": (
+            lambda db: admin.get_users(
+                request=request("/api/admin/users"), response=Response(), cursor=None, limit=100, sort="id",
+                role=None, username_prefix=None, db=db, current_admin=None
+            ), 3
+        ),
+        "admin.get_user": (
+            lambda db: admin.get_user(user_id=1, db=db, current_admin=None), 2
+        ),
+        # 实例读取接口由进程内实例状态表提供，不查询数据库
+        "admin.get_instances(limit=100)": (
+            lambda db: admin.get_instances(
+                request=request("/api/admin/instances"), response=Response(), cursor=None, limit=100, sort="id",
+                health_status=None, container_status=None, name_prefix=None, current_admin=None
+            ), 0
+        ),
+        "admin.get_instance": (
+            lambda db: admin.get_instance(instance_id=1, current_admin=None), 0
+        ),
+        # 按角色统计用户 + 最近探测失败（实例状态来自状态表）
+        "admin.get_dashboard": (
+            lambda db: admin.get_dashboard(db=db, current_admin=None), 2
+        ),
+    }
+
+
+def count_queries(engine, func) -> int:
+    """统计 func 执行期间发出的 SQL 条数"""
+    from sqlalchemy import event
+    from app.database import SessionLocal
+
+    statements = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    db = SessionLocal()
+    try:
+        func(db)
+    finally:
+        db.close()
+        event.remove(engine, "before_cursor_execute", on_execute)
+    return len(statements)
+
+
+def seed(engine, rows):
+    """写入测试数据并收集统计信息"""
+    from sqlalchemy import insert, text
+    from app.models import AuditLog, HealthCheckRecord, Instance, User, UserInstance, UserRole
+
+    now = datetime.utcnow()
+    users = max(1, rows // 10)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"username": f"user_{i}", "password_hash": "x", "role": UserRole.USER,
+             "created_at": now, "updated_at": now}
+            for i in range(users)
+        ])
+        conn.execute(insert(Instance), [
+            {"name": f"instance_{i}", "url": f"https://example.com/{i}",
+             "health_status": ("healthy", "unhealthy", "unknown")[i % 3],
+             "container_status": ("running", "exited", "created", "removed")[i % 4],
+             "created_at": now, "updated_at": now - timedelta(seconds=i)}
+            for i in range(rows)
+        ])
+        conn.execute(insert(UserInstance), [
+            {"user_id": i % users + 1, "instance_id": i + 1, "created_at": now}
+            for i in range(rows)
+        ])
+        conn.execute(insert(HealthCheckRecord), [
+            {"instance_id": i % rows + 1, "checked_at": now - timedelta(minutes=i), "healthy": i % 10 != 0,
+             "latency_ms": 10}
+            for i in range(rows * 5)
+        ])
+        conn.execute(insert(AuditLog), [
+            {"created_at": now - timedelta(minutes=i), "actor_id": i % users + 1, "action": "instance.start",
+             "target_type": "instance", "target_id": i % rows + 1}
+            for i in range(rows * 5)
+        ])
+        conn.execute(text("ANALYZE"))
+
+
+def explain(conn, statement):
+    """返回查询计划的 detail 列"""
+    from sqlalchemy import text
+
+    sql = str(statement.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+    return [row[-1] for row in conn.execute(text("EXPLAIN QUERY PLAN " + sql))]
+
+
+def is_full_scan(detail: str) -> bool:
+    """SCAN 表示逐行扫描整张表（或整个索引），SEARCH 表示按索引定位"""
+    return detail.startswith("SCAN ") and "CONSTANT ROW" not in detail
+
+
+def main():
+    parser = argparse.ArgumentParser(description="热点查询计划与查询次数检查")
+    parser.add_argument("--rows", type=int, default=2000, help="写入的实例数量")
+    parser.add_argument("--verbose", action="store_true", help="输出每条查询的完整计划")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="query_plan_")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'plan.db')}"
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    from app.database import engine
+    from app.services.migrations import run_migrations
+
+    run_migrations(engine)
+    seed(engine, args.rows)
+
+    failures = []
+    with engine.connect() as conn:
+        for name, statement in build_hot_queries().items():
+            details = explain(conn, statement)
+            scans = [d for d in details if is_full_scan(d)]
+            print(f"{'✗' if scans else '✓'} {name}: {' | '.join(details)}" if args.verbose or scans
+                  else f"✓ {name}")
+            if scans:
+                failures.append(name)
+
+    # 与应用启动时一样先加载实例状态表
+    from app.services.fleet_state import fleet_state
+    fleet_state.load()
+
+    print()
+    for name, (func, budget) in build_query_budgets().items():
+        count = count_queries(engine, func)
+        print(f"{'✗' if count > budget else '✓'} {name}: {count} 条 SQL（上限 {budget}）")
+        if count > budget:
+            failures.append(name)
+
+    if failures:
+        print(f"\n{len(failures)} 项检查未通过: {', '.join(failures)}")
+        sys.exit(1)
+    print("\n所有热点查询均使用索引，接口查询次数未超出上限")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+数据库迁移脚本 - 执行 app/services/migrations.py 中尚未执行的结构迁移
+
+应用启动时会自动执行同样的迁移，此脚本用于在部署前手动升级或查看当前版本。
+
+运行方式：
+python migrate.py
+python migrate.py --status
+"""
+import argparse
+from sqlalchemy.exc import DBAPIError
+from app.database import engine
+from app.services.migrations import MIGRATIONS, current_version, run_migrations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="数据库结构迁移")
+    parser.add_argument("--status", action="store_true", help="仅显示当前版本和待执行的迁移")
+    args = parser.parse_args()
+
+    try:
+        with engine.connect() as conn:
+            version = current_version(conn)
+    except DBAPIError:
+        version = 0
+    pending = [m for m in MIGRATIONS if m.version > version]
+    print(f"当前版本: {version}，最新版本: {MIGRATIONS[-1].version}")
+    for item in pending:
+        print(f"  待执行: {item.version} {item.name}")
+
+    if args.status:
+        return
+    if not pending:
+        print("✅ 数据库结构已是最新，无需迁移")
+        return
+    run_migrations(engine)
+    print("迁移完成！")
+
+
+if __name__ == "__main__":
+    main()